@@ -19,6 +19,7 @@ import platform
 import shutil
 import subprocess
 import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -241,6 +242,51 @@ def install_mcp_servers() -> int:
     return installed
 
 
+# ---------------------------------------------------------------------------
+# 1d. SKILL VERSION STATUS (from the background updater, no network)
+# ---------------------------------------------------------------------------
+
+def report_skill_versions(repo_root: Path) -> int:
+    """Show pending skill updates published by update-skills.py --refresh-status."""
+    print("\n" + "=" * 60)
+    print("  STEP 1d: Skill Version Status")
+    print("=" * 60)
+
+    # Imported here so the other install steps don't pay for the updater
+    from updater.compare import is_newer
+    from updater.status import STATUS_MAX_AGE, read_status
+
+    status = read_status(max_age=None)
+    if status is None:
+        print("  No background version status yet. To publish one, run:")
+        print("    python scripts/update-skills.py --refresh-status")
+        return 0
+    if time.time() - status.get("checked_at", 0) > STATUS_MAX_AGE:
+        print(f"  Version status is older than {STATUS_MAX_AGE // 3600}h "
+              f"(last checked: {status.get('checked', 'unknown')}). Refresh it with:")
+        print("    python scripts/update-skills.py --refresh-status")
+        return 0
+
+    print(f"  Last checked: {status.get('checked', 'unknown')}")
+    pending = 0
+    for versions_file in sorted((repo_root / "skills").glob("*/versions.json")):
+        skill_name = versions_file.parent.name
+        results = status.get("skills", {}).get(skill_name, {})
+        packages = _read_json(versions_file).get("packages", {})
+        for name, info in packages.items():
+            tracked = info.get("version", "")
+            latest = (results.get(name) or {}).get("latest")
+            if latest and tracked and is_newer(latest, tracked):
+                print(f"  [UPDATE] {skill_name}/{name}: {tracked} -> {latest}")
+                pending += 1
+
+    if pending:
+        print(f"\n  {pending} update(s) available. Apply with: python scripts/update-skills.py")
+    else:
+        print("  All tracked skill versions are up to date.")
+    return pending
+
+
 # ---------------------------------------------------------------------------
 # 2. WINDOWS HOOK FIXES
 # ---------------------------------------------------------------------------
@@ -1016,6 +1062,9 @@ def main():
     # Step 1c: Install MCP servers
     install_mcp_servers()
 
+    # Step 1d: Report pending skill updates (reads cached status only)
+    report_skill_versions(repo_root)
+
     # Step 2: Fix Windows hooks
     fix_windows_hooks()
 
@@ -3,244 +3,43 @@
 Universal Skill Version Updater
 
 Scans all skills with a versions.json, checks npm/PyPI for latest versions,
-and updates SKILL.md version references.
+updates SKILL.md version references and appends release notes for the
+releases in between.
 
 Usage:
     python scripts/update-skills.py              # Interactive: choose what to update
     python scripts/update-skills.py --check      # Check only, no changes
     python scripts/update-skills.py --auto       # Auto-update all to latest
     python scripts/update-skills.py --skill react-19  # Update specific skill only
+    python scripts/update-skills.py --auto --no-notes # Skip fetching release notes
+    python scripts/update-skills.py --check --deadline 30  # Give up after 30s
+    python scripts/update-skills.py --index      # Rebuild versions.index.json files
+    python scripts/update-skills.py --verify     # Check indexed references (offline)
+    python scripts/update-skills.py --refresh-status  # Publish status file (for cron)
+    python scripts/update-skills.py --daemon --interval 3600  # Refresh periodically
+    python scripts/update-skills.py --check --live    # Ignore the status file
 
 Supports both npm and PyPI registries (auto-detected from versions.json).
-"""
-
-import json
-import re
-import sys
-import urllib.request
-from datetime import date
-from pathlib import Path
-from typing import Optional
-
-
-# ---------------------------------------------------------------------------
-# Configuration
-# ---------------------------------------------------------------------------
-
-SCRIPT_DIR = Path(__file__).parent
-REPO_ROOT = SCRIPT_DIR.parent
-SKILLS_DIR = REPO_ROOT / "skills"
-
-NPM_URL = "https://registry.npmjs.org/{package}/latest"
-PYPI_URL = "https://pypi.org/pypi/{package}/json"
-PYTHON_VERSIONS_URL = "https://www.python.org/api/v2/downloads/release/?is_published=true"
-
-
-# ---------------------------------------------------------------------------
-# Discovery
-# ---------------------------------------------------------------------------
-
-def find_versioned_skills() -> list[dict]:
-    """Find all skills that have a versions.json file."""
-    skills = []
-    for versions_file in sorted(SKILLS_DIR.glob("*/versions.json")):
-        skill_dir = versions_file.parent
-        skill_name = skill_dir.name
-        skill_file = skill_dir / "SKILL.md"
-
-        try:
-            data = json.loads(versions_file.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError) as e:
-            print(f"  WARNING: Could not read {versions_file}: {e}")
-            continue
-
-        skills.append({
-            "name": skill_name,
-            "dir": skill_dir,
-            "versions_file": versions_file,
-            "skill_file": skill_file,
-            "data": data,
-            "registry": data.get("registry", "pypi"),
-        })
-
-    return skills
-
-
-# ---------------------------------------------------------------------------
-# Version fetching
-# ---------------------------------------------------------------------------
-
-def fetch_npm_version(package_name: str) -> Optional[str]:
-    """Fetch latest version from npm registry."""
-    try:
-        url = NPM_URL.format(package=package_name)
-        req = urllib.request.Request(url, headers={"Accept": "application/json"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-            return data.get("version")
-    except Exception:
-        return None
-
-
-def fetch_pypi_version(package_name: str) -> Optional[str]:
-    """Fetch latest version from PyPI."""
-    try:
-        url = PYPI_URL.format(package=package_name)
-        req = urllib.request.Request(url, headers={"Accept": "application/json"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-            return data["info"]["version"]
-    except Exception:
-        return None
-
-
-def fetch_latest_python_version() -> Optional[str]:
-    """Fetch latest stable Python version from python.org API."""
-    try:
-        req = urllib.request.Request(
-            PYTHON_VERSIONS_URL,
-            headers={"Accept": "application/json"},
-        )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-            stable = []
-            for release in data:
-                name = release.get("name", "")
-                match = re.match(r"Python (\d+\.\d+\.\d+)$", name)
-                if match:
-                    stable.append(match.group(1))
-            if stable:
-                stable.sort(
-                    key=lambda v: tuple(int(x) for x in v.split(".")),
-                    reverse=True,
-                )
-                return stable[0]
-    except Exception:
-        pass
-    return None
-
-
-def fetch_version(package_name: str, registry: str, pkg_info: dict) -> Optional[str]:
-    """Fetch latest version from the appropriate registry."""
-    if package_name == "Python":
-        return fetch_latest_python_version()
-
-    if registry == "npm":
-        npm_name = pkg_info.get("npm", package_name)
-        return fetch_npm_version(npm_name)
-    else:
-        pypi_name = pkg_info.get("pypi", package_name)
-        return fetch_pypi_version(pypi_name)
-
-
-# ---------------------------------------------------------------------------
-# Version comparison
-# ---------------------------------------------------------------------------
-
-def parse_version(v: str) -> tuple:
-    """Parse version string into comparable tuple."""
-    parts = []
-    for p in v.split("."):
-        try:
-            parts.append(int(p))
-        except ValueError:
-            parts.append(p)
-    return tuple(parts)
-
-
-def is_newer(latest: str, tracked: str) -> bool:
-    """Check if latest version is newer than tracked."""
-    try:
-        return parse_version(latest) > parse_version(tracked)
-    except (TypeError, ValueError):
-        return latest != tracked
-
-
-def check_skill(skill: dict) -> list[dict]:
-    """Check all packages in a skill for updates. Returns list of updates."""
-    packages = skill["data"].get("packages", {})
-    registry = skill["registry"]
-    updates = []
-
-    for name, info in packages.items():
-        tracked_ver = info.get("version", "?")
-        latest_ver = fetch_version(name, registry, info)
-
-        if latest_ver is None:
-            status = "ERROR"
-            latest_ver = "?"
-        elif is_newer(latest_ver, tracked_ver):
-            status = "UPDATE"
-        else:
-            status = "OK"
-
-        marker = ">>" if status == "UPDATE" else "  "
-        print(f"  {marker} {name:<35} {tracked_ver:<12} {latest_ver:<12} {status}")
-
-        if status == "UPDATE":
-            updates.append({
-                "name": name,
-                "tracked": tracked_ver,
-                "latest": latest_ver,
-                "docs_url": info.get("docs_url", ""),
-                "role": info.get("role", ""),
-            })
+The work is done by the shared engine in scripts/updater/.
+Hosts that keep failing are skipped by a per-host circuit breaker, so a slow
+or unreachable registry costs a few seconds rather than minutes.
 
-    return updates
+When a skill has a versions.index.json (see --index), updates rewrite only
+the indexed spans across SKILL.md, the skill's other markdown and docs/.
 
+--check reads ~/.claude/skill-versions-status.json when a background
+refresh has published one in the last day, so it returns instantly.
+"""
 
-# ---------------------------------------------------------------------------
-# Updating files
-# ---------------------------------------------------------------------------
-
-def update_versions_json(skill: dict, updates: list[dict]) -> None:
-    """Update versions.json with new versions."""
-    data = skill["data"]
-    packages = data["packages"]
-
-    for upd in updates:
-        if upd["name"] in packages:
-            packages[upd["name"]]["version"] = upd["latest"]
-
-    data["last_updated"] = date.today().isoformat()
-
-    with open(skill["versions_file"], "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-        f.write("\n")
-
-
-def update_skill_md(skill: dict, updates: list[dict]) -> None:
-    """Update version references in SKILL.md."""
-    skill_file = skill["skill_file"]
-    if not skill_file.exists():
-        return
-
-    content = skill_file.read_text(encoding="utf-8")
-
-    for upd in updates:
-        old_ver = re.escape(upd["tracked"])
-        new_ver = upd["latest"]
-
-        # Replace version in table rows: | Package | old_version | ... |
-        pattern = re.compile(
-            r"(\|\s*" + re.escape(upd["name"]) + r"\s*\|\s*)" +
-            old_ver + r"(\s*\|)"
-        )
-        content = pattern.sub(r"\g<1>" + new_ver + r"\g<2>", content)
-
-        # Replace version in CDN URLs: package@old_version -> package@new_version
-        # Handle both scoped (@org/pkg) and unscoped packages
-        pkg_name = upd["name"]
-        cdn_pattern = re.compile(re.escape(pkg_name) + r"@" + old_ver)
-        content = cdn_pattern.sub(pkg_name + "@" + new_ver, content)
-
-        # Replace version in import maps and generic references
-        content = content.replace(
-            f"{pkg_name}/{upd['tracked']}",
-            f"{pkg_name}/{new_ver}",
-        )
+import sys
+import time
 
-    skill_file.write_text(content, encoding="utf-8")
+from updater import REPO_ROOT
+from updater.compare import check_skill, print_table_header
+from updater.registry import set_deadline
+from updater.rewrite import apply_updates, build_index, index_path, load_index, verify_index, write_index
+from updater.skills import find_versioned_skills
+from updater.status import REFRESH_INTERVAL, STATUS_FILE, read_status, refresh_status, run_daemon
 
 
 # ---------------------------------------------------------------------------
@@ -305,6 +104,7 @@ def main():
 
     check_only = "--check" in sys.argv
     auto_update = "--auto" in sys.argv
+    with_notes = "--no-notes" not in sys.argv
 
     # Filter to specific skill if requested
     skill_filter = None
@@ -313,6 +113,15 @@ def main():
         if idx + 1 < len(sys.argv):
             skill_filter = sys.argv[idx + 1]
 
+    # Optional wall-clock budget for all registry lookups
+    if "--deadline" in sys.argv:
+        idx = sys.argv.index("--deadline")
+        try:
+            set_deadline(float(sys.argv[idx + 1]))
+        except (IndexError, ValueError):
+            print("\n  ERROR: --deadline expects a number of seconds.")
+            sys.exit(1)
+
     # Find all skills with versions.json
     skills = find_versioned_skills()
     if skill_filter:
@@ -328,23 +137,98 @@ def main():
     print(f"\n  Found {len(skills)} versioned skill(s): "
           + ", ".join(s["name"] for s in skills))
 
+    # Offline index maintenance modes
+    if "--index" in sys.argv:
+        for skill in skills:
+            index = build_index(skill)
+            write_index(skill, index)
+            print(f"\n  [{skill['name']}] wrote {index_path(skill).relative_to(REPO_ROOT)}")
+            for name, refs in index["packages"].items():
+                note = "" if refs else "  (no references)"
+                print(f"    {name:<35} {len(refs):>3} reference(s){note}")
+        print("\n" + "=" * 60)
+        return
+
+    if "--verify" in sys.argv:
+        drifted = 0
+        for skill in skills:
+            index = load_index(skill)
+            if index is None:
+                print(f"\n  [{skill['name']}] no index (run --index)")
+                drifted += 1
+                continue
+            problems = verify_index(skill, index)
+            refs = sum(len(r) for r in index.get("packages", {}).values())
+            status = "OK" if not problems else f"{len(problems)} problem(s)"
+            print(f"\n  [{skill['name']}] {refs} indexed reference(s): {status}")
+            for problem in problems:
+                print(f"    - {problem}")
+            drifted += bool(problems)
+        print("\n" + "=" * 60)
+        sys.exit(1 if drifted else 0)
+
+    # Background refresh modes
+    if "--refresh-status" in sys.argv:
+        status = refresh_status(skills)
+        if status is None:
+            print("\n  Another refresh is already running; nothing to do.")
+        else:
+            print(f"\n  Published status to {STATUS_FILE}")
+        print("\n" + "=" * 60)
+        return
+
+    if "--daemon" in sys.argv:
+        interval = REFRESH_INTERVAL
+        if "--interval" in sys.argv:
+            idx = sys.argv.index("--interval")
+            try:
+                interval = float(sys.argv[idx + 1])
+            except (IndexError, ValueError):
+                print("\n  ERROR: --interval expects a number of seconds.")
+                sys.exit(1)
+        run_daemon(skills, interval)
+        return
+
+    # --check answers from the published status unless --live is given
+    cached = None
+    if check_only and "--live" not in sys.argv:
+        cached = read_status()
+        if cached:
+            age_min = (time.time() - cached["checked_at"]) / 60
+            print(f"  Using background status from {cached['checked']} "
+                  f"({age_min:.0f} min old; --live to refresh)")
+
     # Check each skill
     all_updates: dict[str, list[dict]] = {}
+    all_skipped: dict[str, list[dict]] = {}
 
     for skill in skills:
         registry = skill["registry"].upper()
         print(f"\n  --- {skill['name']} ({registry}) ---")
-        print(f"  {'Package':<35} {'Tracked':<12} {'Latest':<12} {'Status'}")
-        print(f"  {'-'*35} {'-'*12} {'-'*12} {'-'*10}")
+        print_table_header()
 
-        updates = check_skill(skill)
+        results = cached["skills"].get(skill["name"]) if cached else None
+        updates, skipped = check_skill(skill, results)
         if updates:
             all_updates[skill["name"]] = updates
+        if skipped:
+            all_skipped[skill["name"]] = skipped
+
+    # Report lookups that failed or were skipped
+    if all_skipped:
+        count = sum(len(s) for s in all_skipped.values())
+        print(f"\n  {count} package(s) could not be checked:")
+        for skill_name, skipped in all_skipped.items():
+            for item in skipped:
+                print(f"    {skill_name}/{item['name']}: {item['status']} - {item['reason']}")
 
     # Summary
     total = sum(len(u) for u in all_updates.values())
     if total == 0:
-        print("\n  All packages across all skills are up to date.")
+        if all_skipped:
+            print("\n  No updates found among the packages that could be checked.")
+        else:
+            print("\n  All packages across all skills are up to date.")
         print("\n" + "=" * 60)
         return
 
@@ -367,19 +251,33 @@ def main():
         print("\n" + "=" * 60)
         return
 
+    # Build a lookup of skills by name
+    skill_lookup = {s["name"]: s for s in skills}
+
+    # Release notes for the releases between tracked and latest
+    release_notes: dict[str, dict[str, str]] = {}
+    if with_notes:
+        # Imported here: the notes stage is the heaviest part of the engine
+        from updater.notes import append_release_notes, fetch_release_notes
+
+        print("\n  Fetching release notes...\n")
+        for skill_name, updates in selected.items():
+            release_notes[skill_name] = fetch_release_notes(updates)
+
     # Apply updates
     print("\n  Applying updates...")
     total_updated = 0
 
-    # Build a lookup of skills by name
-    skill_lookup = {s["name"]: s for s in skills}
-
     for skill_name, updates in selected.items():
         skill = skill_lookup[skill_name]
-        update_versions_json(skill, updates)
-        update_skill_md(skill, updates)
+        counts = apply_updates(skill, updates)
         total_updated += len(updates)
         print(f"    [{skill_name}] {len(updates)} package(s) updated")
+        for pkg_name, count in counts.items():
+            note = "" if count else "  (no references found)"
+            print(f"      {pkg_name}: {count} reference(s) rewritten{note}")
+        if with_notes:
+            append_release_notes(skill, release_notes[skill_name])
 
     # Final summary
     print("\n" + "=" * 60)
@@ -389,6 +287,9 @@ def main():
     for skill_name, updates in selected.items():
         for upd in updates:
             print(f"    {skill_name}/{upd['name']}: {upd['tracked']} -> {upd['latest']}")
+    noted = sum(len(notes) for notes in release_notes.values())
+    if noted:
+        print(f"\n  Release notes appended to SKILL.md ({noted} package(s))")
 
     print(f"\n  Run 'python scripts/install-skills.py' to push updates to ~/.claude/skills/")
     print()
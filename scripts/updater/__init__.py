@@ -0,0 +1,19 @@
+"""
+Skill updater engine shared by update-skills.py and update-django-skill.py.
+
+Stages, one module each:
+    skills    discover skills with a versions.json, write versions.json
+    registry  npm / PyPI / python.org clients (retries, circuit breaker, deadline)
+    compare   version comparison and the per-skill status table
+    rewrite   single-pass version rewriting and the versions.index.json index
+    status    background refresh published to a status file
+    notes     release-notes scraping, changelog adapters and their cache
+
+The entry-point scripts only parse arguments, prompt, and chain stages.
+"""
+
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+SKILLS_DIR = REPO_ROOT / "skills"
+DOCS_DIR = REPO_ROOT / "docs"
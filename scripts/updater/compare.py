@@ -0,0 +1,110 @@
+"""
+Version comparison and the per-skill status table.
+"""
+
+from typing import Optional
+
+from updater.registry import FetchError, FetchSkipped, fetch_version
+
+
+# ---------------------------------------------------------------------------
+# Version comparison
+# ---------------------------------------------------------------------------
+
+def parse_version(v: str) -> tuple:
+    """Parse version string into comparable tuple."""
+    parts = []
+    for p in v.split("."):
+        try:
+            parts.append(int(p))
+        except ValueError:
+            parts.append(p)
+    return tuple(parts)
+
+
+def is_newer(latest: str, tracked: str) -> bool:
+    """Check if latest version is newer than tracked."""
+    try:
+        return parse_version(latest) > parse_version(tracked)
+    except (TypeError, ValueError):
+        return latest != tracked
+
+
+def lookup_package(name: str, registry: str, info: dict) -> dict:
+    """Look up one package's latest version.
+
+    Returns {"latest": str | None, "error": "ERROR" | "SKIPPED" | None,
+    "reason": str}, the same shape that is stored in the status file.
+    """
+    try:
+        latest = fetch_version(name, registry, info)
+    except FetchSkipped as e:
+        return {"latest": None, "error": "SKIPPED", "reason": str(e)}
+    except FetchError as e:
+        return {"latest": None, "error": "ERROR", "reason": str(e)}
+    if latest is None:
+        return {"latest": None, "error": "ERROR", "reason": "no version in response"}
+    return {"latest": latest, "error": None, "reason": ""}
+
+
+def fetch_skill_status(skill: dict) -> dict[str, dict]:
+    """Look up every package in a skill. Returns {package: lookup result}."""
+    packages = skill["data"].get("packages", {})
+    return {
+        name: lookup_package(name, skill["registry"], info)
+        for name, info in packages.items()
+    }
+
+
+def print_table_header() -> None:
+    print(f"  {'Package':<35} {'Tracked':<12} {'Latest':<12} {'Status'}")
+    print(f"  {'-'*35} {'-'*12} {'-'*12} {'-'*10}")
+
+
+def check_skill(skill: dict, results: Optional[dict[str, dict]] = None) -> tuple[list[dict], list[dict]]:
+    """Check all packages in a skill for updates.
+
+    Uses results (from the status file) where available and looks up any
+    missing packages live. Returns (updates, skipped) where skipped entries
+    carry the reason the lookup failed or was not attempted.
+    """
+    packages = skill["data"].get("packages", {})
+    registry = skill["registry"]
+    results = results or {}
+    updates = []
+    skipped = []
+
+    for name, info in packages.items():
+        tracked_ver = info.get("version", "?")
+        result = results.get(name) or lookup_package(name, registry, info)
+        latest_ver = result["latest"]
+        reason = result["reason"]
+
+        if latest_ver is None:
+            status = result["error"]
+            latest_ver = "?"
+            skipped.append({"name": name, "status": status, "reason": reason})
+        elif is_newer(latest_ver, tracked_ver):
+            status = "UPDATE"
+        else:
+            status = "OK"
+
+        marker = ">>" if status == "UPDATE" else "  "
+        line = f"  {marker} {name:<35} {tracked_ver:<12} {latest_ver:<12} {status}"
+        if reason:
+            line += f" ({reason})"
+        print(line)
+
+        if status == "UPDATE":
+            updates.append({
+                "name": name,
+                "tracked": tracked_ver,
+                "latest": latest_ver,
+                "docs_url": info.get("docs_url", ""),
+                "role": info.get("role", ""),
+                "registry": registry,
+                "pypi": info.get("pypi", name),
+                "npm": info.get("npm", name),
+            })
+
+    return updates, skipped
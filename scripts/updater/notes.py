@@ -0,0 +1,717 @@
+"""
+Release notes: official-docs scrapers, changelog adapters and their cache.
+
+Requires requests, optional: without it notes fall back to a pointer at
+the docs. Pages are parsed with the stdlib html.parser; beautifulsoup4 is
+only used to search the Django release index when a version's notes are
+not at their usual URL, and that lookup is skipped without it.
+"""
+
+import codecs
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from datetime import date
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Optional
+
+from updater.registry import fetch_release_versions
+from updater.rewrite import build_index, load_index, write_index
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+# Official doc URLs for scraping release notes
+DJANGO_RELEASE_NOTES = "https://docs.djangoproject.com/en/{major}/releases/{version}/"
+DJANGO_RELEASE_INDEX = "https://docs.djangoproject.com/en/stable/releases/"
+PYTHON_WHATSNEW = "https://docs.python.org/3/whatsnew/{version}.html"
+
+SCRAPE_TIMEOUT = 15        # Seconds per docs request
+SCRAPE_WORKERS = 8         # Release-notes pages fetched in parallel
+
+# Extracted release notes are cached forever: published notes for a version
+# don't change. Bump EXTRACTOR_VERSION whenever the scrapers' output changes
+# so stale extractions are ignored.
+NOTES_CACHE_DIR = Path.home() / ".claude" / "cache" / "release-notes"
+EXTRACTOR_VERSION = 1
+
+
+# ---------------------------------------------------------------------------
+# Dependency check
+# ---------------------------------------------------------------------------
+
+def ensure_dependencies():
+    """Check for requests and bs4, offer to install if missing."""
+    import importlib.util
+
+    missing = [
+        package for module, package in (("requests", "requests"), ("bs4", "beautifulsoup4"))
+        if importlib.util.find_spec(module) is None
+    ]
+
+    if not missing:
+        return True
+
+    print(f"\n  Optional dependencies missing: {', '.join(missing)}")
+    print("  These are needed for doc scraping (release notes).")
+    print("  Version checking works without them (uses stdlib).\n")
+
+    answer = input("  Install them now? [Y/n]: ").strip().lower()
+    if answer in ("", "y", "yes"):
+        import subprocess
+
+        subprocess.check_call(
+            [sys.executable, "-m", "pip", "install", *missing, "-q"]
+        )
+        print("  Installed successfully.\n")
+        return True
+    else:
+        print("  Skipping doc scraping - version checks only.\n")
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Doc scraping
+# ---------------------------------------------------------------------------
+
+def make_session():
+    """Create a requests.Session shared by all scrapers (connection reuse).
+
+    Returns None if requests is not installed.
+    """
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+    except ImportError:
+        return None
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=SCRAPE_WORKERS, pool_maxsize=SCRAPE_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "ai-engineer-skill-updater"
+    return session
+
+
+def find_django_release_url(session, version: str) -> Optional[str]:
+    """Look up a version's release notes link on the Django release index.
+
+    Returns None if it isn't listed or beautifulsoup4 is not installed.
+    """
+    from urllib.parse import urljoin
+
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        return None
+
+    resp = session.get(DJANGO_RELEASE_INDEX, timeout=SCRAPE_TIMEOUT)
+    if resp.status_code != 200:
+        return None
+
+    soup = BeautifulSoup(resp.text, "html.parser")
+    for link in soup.find_all("a", href=True):
+        href = link["href"].split("#")[0]
+        if href.rstrip("/").endswith(f"/{version}") or href.rstrip("/") == version:
+            return urljoin(DJANGO_RELEASE_INDEX, href)
+    return None
+
+
+# Section extraction streams the page through html.parser instead of building
+# a BeautifulSoup tree. It mirrors the tree-walking rules it replaced: within
+# the first matching container, each h2/h3 whose text contains a keyword
+# starts a section, and the p/ul/li elements that are *siblings* of that
+# heading (up to the next h2/h3 sibling) become its items.
+
+DJANGO_CONTAINERS = [("id", "docs-content"), ("class", "document")]
+DJANGO_KEYWORDS = ["what's new", "new feature", "backward", "deprecat", "bug fix", "minor feature"]
+PYTHON_CONTAINERS = [("id", "whats-new-in-python"), ("class", "document")]
+PYTHON_KEYWORDS = ["summary", "new feature", "new module", "improved", "deprecat", "removed", "notable"]
+
+MAX_SECTIONS = 5
+MAX_SECTION_ITEMS = 14     # Plus the heading line: 15 lines per section
+MAX_ITEM_CHARS = 200
+STREAM_CHUNK = 16384
+
+_HEADINGS = ("h2", "h3")
+_ITEMS = ("p", "li", "ul")
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+         "link", "meta", "source", "track", "wbr"}
+
+
+class SectionExtractor(HTMLParser):
+    """Incrementally collect keyword sections from a docs page.
+
+    Feed text chunks with feed() and check `done` between chunks; once the
+    first-choice container has produced max_sections complete sections the
+    rest of the page is irrelevant. Call sections() for the result (None if
+    no container matched). Headings are selected by keyword substring, or
+    by the match predicate when one is given.
+    """
+
+    def __init__(self, containers: list[tuple[str, str]], keywords: list[str],
+                 match=None, max_sections: int = MAX_SECTIONS):
+        super().__init__(convert_charrefs=True)
+        self.match = match or (lambda text: any(kw in text.lower() for kw in keywords))
+        self.max_sections = max_sections
+        # One scope per candidate container, in priority order
+        self.scopes = [
+            {"attr": attr, "value": value, "depth": None, "closed": False, "sections": []}
+            for attr, value in containers
+        ]
+        self.stack: list[str] = []
+        self.captures: list[dict] = []
+        self.text: list[str] = []
+        self.done = False
+
+    # -- helpers ----------------------------------------------------------
+
+    def _active_scopes(self):
+        return [sc for sc in self.scopes if sc["depth"] is not None and not sc["closed"]]
+
+    def _flush_text(self) -> None:
+        # A text node ends at the next tag; strip it whole, like get_text(strip=True)
+        if not self.text:
+            return
+        text = "".join(self.text).strip()
+        self.text = []
+        if text:
+            for capture in self.captures:
+                capture["parts"].append(text)
+
+    def _close_section(self, scope: dict, section: dict) -> None:
+        section["open"] = False
+        if not section["items"]:
+            scope["sections"].remove(section)
+        first = self.scopes[0]["sections"][:self.max_sections]
+        if len(first) == self.max_sections and not any(sec["open"] for sec in first):
+            self.done = True
+
+    def _close_element(self, depth: int) -> None:
+        for capture in [c for c in self.captures if c["depth"] == depth]:
+            self.captures.remove(capture)
+            text = "".join(capture["parts"])
+            if capture["section"] is not None:
+                capture["section"]["items"].append(f"- {text[:MAX_ITEM_CHARS]}")
+                continue
+            if self.match(text):
+                for scope in capture["scopes"]:
+                    scope["sections"].append(
+                        {"title": text, "depth": depth, "items": [], "open": True}
+                    )
+
+        for scope in self.scopes:
+            if scope["depth"] == depth and not scope["closed"]:
+                scope["closed"] = True
+            for section in [s for s in scope["sections"] if s["open"] and s["depth"] == depth + 1]:
+                self._close_section(scope, section)
+
+    # -- HTMLParser callbacks ---------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        depth = len(self.stack)
+
+        attrs = dict(attrs)
+        for scope in self.scopes:
+            if scope["depth"] is None:
+                value = attrs.get(scope["attr"]) or ""
+                if scope["value"] in (value.split() if scope["attr"] == "class" else [value]):
+                    scope["depth"] = depth
+
+        active = self._active_scopes()
+        for scope in active:
+            for section in [s for s in scope["sections"] if s["open"] and s["depth"] == depth]:
+                if tag in _HEADINGS:
+                    self._close_section(scope, section)
+                elif tag in _ITEMS and len(section["items"]) < MAX_SECTION_ITEMS:
+                    self.captures.append({"depth": depth, "parts": [], "section": section})
+
+        if tag in _HEADINGS and active:
+            self.captures.append({"depth": depth, "parts": [], "section": None, "scopes": active})
+
+        if tag in _VOID:
+            self._close_element(depth)
+        else:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag not in self.stack:
+            return  # Stray end tag
+        while self.stack:
+            name = self.stack.pop()
+            self._close_element(len(self.stack))
+            if name == tag:
+                break
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    # -- result -----------------------------------------------------------
+
+    def sections(self) -> Optional[list[str]]:
+        """Formatted sections from the first container that was found."""
+        for scope in self.scopes:
+            if scope["depth"] is not None:
+                return [
+                    "\n".join([f"### {sec['title']}", *sec["items"]])
+                    for sec in scope["sections"][:self.max_sections]
+                    if sec["items"]
+                ]
+        return None
+
+
+def extract_sections(chunks, containers: list[tuple[str, str]], keywords: list[str],
+                     match=None, max_sections: int = MAX_SECTIONS) -> Optional[list[str]]:
+    """Run SectionExtractor over an iterable of text chunks, stopping early."""
+    parser = SectionExtractor(containers, keywords, match, max_sections)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    else:
+        parser.close()
+    parser._flush_text()
+    # Anything still open at end of input is closed by the end of the page
+    while parser.stack:
+        parser.stack.pop()
+        parser._close_element(len(parser.stack))
+    return parser.sections()
+
+
+def iter_response_text(resp):
+    """Decode a streamed requests response chunk by chunk."""
+    decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    for chunk in resp.iter_content(STREAM_CHUNK):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def scrape_django_release_notes(version: str, session=None) -> str:
+    """Scrape Django release notes from official docs."""
+    session = session or make_session()
+    if session is None:
+        return f"(Install requests for release notes)\nSee: https://docs.djangoproject.com/en/stable/releases/{version}/"
+
+    major = ".".join(version.split(".")[:2])
+    url = DJANGO_RELEASE_NOTES.format(major=major, version=version)
+
+    try:
+        resp = session.get(url, timeout=SCRAPE_TIMEOUT, stream=True)
+        if resp.status_code != 200:
+            resp.close()
+            # Docs for a new series may not be published under /en/{major}/
+            # yet; find the page through the stable release index instead.
+            status = resp.status_code
+            index_url = find_django_release_url(session, version)
+            if index_url is None:
+                return (f"Could not fetch release notes (HTTP {status})\nURL: {url}\n"
+                        f"See: {DJANGO_RELEASE_INDEX}")
+            url = index_url
+            resp = session.get(url, timeout=SCRAPE_TIMEOUT, stream=True)
+            if resp.status_code != 200:
+                resp.close()
+                return f"Could not fetch release notes (HTTP {resp.status_code})\nURL: {url}"
+
+        # Extract key sections: What's new, backwards incompatible, deprecations
+        with resp:
+            sections = extract_sections(iter_response_text(resp), DJANGO_CONTAINERS, DJANGO_KEYWORDS)
+        if sections is None:
+            return f"Release notes page found but could not parse content.\nURL: {url}"
+
+        if sections:
+            return f"Source: {url}\n\n" + "\n\n".join(sections)
+        return f"Release notes found but no key sections extracted.\nURL: {url}"
+
+    except Exception as e:
+        return f"Error fetching release notes: {e}\nURL: {url}"
+
+
+def scrape_python_whatsnew(version: str, session=None) -> str:
+    """Scrape Python What's New from official docs."""
+    session = session or make_session()
+    if session is None:
+        return f"(Install requests for what's new)\nSee: https://docs.python.org/3/whatsnew/{version}.html"
+
+    # Use major.minor for what's new page
+    parts = version.split(".")
+    short_ver = f"{parts[0]}.{parts[1]}"
+    url = PYTHON_WHATSNEW.format(version=short_ver)
+
+    try:
+        resp = session.get(url, timeout=SCRAPE_TIMEOUT, stream=True)
+        if resp.status_code != 200:
+            resp.close()
+            return f"Could not fetch what's new (HTTP {resp.status_code})\nURL: {url}"
+
+        # Extract summary and new features
+        with resp:
+            sections = extract_sections(iter_response_text(resp), PYTHON_CONTAINERS, PYTHON_KEYWORDS)
+        if sections is None:
+            return f"What's new page found but could not parse.\nURL: {url}"
+
+        if sections:
+            return f"Source: {url}\n\n" + "\n\n".join(sections)
+        return f"What's new page found but no key sections extracted.\nURL: {url}"
+
+    except Exception as e:
+        return f"Error fetching what's new: {e}\nURL: {url}"
+
+
+# ---------------------------------------------------------------------------
+# Changelog adapters (every other package)
+# ---------------------------------------------------------------------------
+#
+# An adapter takes (docs_url, version, session) and returns notes starting
+# with "Source: " or None if it found nothing. CHANGELOG_ADAPTERS lists them
+# in the order they are tried; each entry's predicate decides from docs_url
+# whether the adapter applies.
+
+GITHUB_RELEASE_API = "https://api.github.com/repos/{owner}/{repo}/releases/tags/{tag}"
+GITHUB_RAW = "https://raw.githubusercontent.com/{owner}/{repo}/HEAD/{path}"
+CHANGELOG_FILES = ["CHANGELOG.md", "CHANGES.md", "HISTORY.md", "CHANGES.rst", "CHANGELOG.rst"]
+RTD_CHANGELOG_PAGES = ["changelog.html", "changes.html"]
+RTD_CONTAINERS = [("role", "main"), ("class", "document"), ("class", "body")]
+MAX_NOTES_VERSIONS = 10    # Newest releases summarised per package update
+
+_page_cache: dict[str, Optional[str]] = {}
+_page_locks: dict[str, threading.Lock] = {}
+_page_locks_lock = threading.Lock()
+
+
+def _get_page(session, url: str, headers: Optional[dict] = None) -> Optional[str]:
+    """GET a page once per run; concurrent callers share the first result."""
+    with _page_locks_lock:
+        lock = _page_locks.setdefault(url, threading.Lock())
+    with lock:
+        if url not in _page_cache:
+            resp = session.get(url, timeout=SCRAPE_TIMEOUT, headers=headers)
+            _page_cache[url] = resp.text if resp.status_code == 200 else None
+        return _page_cache[url]
+
+
+def _version_pattern(version: str) -> "re.Pattern[str]":
+    """Match a version as a whole token (6.1 must not match 6.12 or 16.1)."""
+    return re.compile(rf"(?<![\w.])v?{re.escape(version)}(?![\w]|\.\d)")
+
+
+def _summarise_lines(lines: list[str]) -> list[str]:
+    """Turn changelog body lines into capped "- item" bullets."""
+    items = []
+    for line in lines:
+        text = re.sub(r"^\s*(?:[-*+]|\d+\.)\s+", "", line).strip()
+        if not text or text.startswith("#") or set(text) <= set("-=~^*"):
+            continue  # Blank, sub-heading or underline
+        items.append(f"- {text[:MAX_ITEM_CHARS]}")
+        if len(items) == MAX_SECTION_ITEMS:
+            break
+    return items
+
+
+def github_repo(docs_url: str) -> Optional[tuple[str, str]]:
+    match = re.match(r"https?://github\.com/([^/]+)/([^/#?]+)", docs_url)
+    return (match.group(1), match.group(2).removesuffix(".git")) if match else None
+
+
+def github_release_notes(docs_url: str, version: str, session) -> Optional[str]:
+    """Body of the GitHub release tagged v{version} or {version}."""
+    owner, repo = github_repo(docs_url)
+    headers = {"Accept": "application/vnd.github+json"}
+    if os.environ.get("GITHUB_TOKEN"):
+        headers["Authorization"] = f"Bearer {os.environ['GITHUB_TOKEN']}"
+
+    for tag in (f"v{version}", version):
+        page = _get_page(session, GITHUB_RELEASE_API.format(owner=owner, repo=repo, tag=tag), headers)
+        if page is None:
+            continue
+        release = json.loads(page)
+        items = _summarise_lines((release.get("body") or "").splitlines())
+        if items:
+            title = release.get("name") or tag
+            return f"Source: {release.get('html_url', docs_url)}\n\n### {title}\n" + "\n".join(items)
+    return None
+
+
+def changelog_file_notes(docs_url: str, version: str, session) -> Optional[str]:
+    """The section for version in the repo's CHANGELOG.md (or similar)."""
+    owner, repo = github_repo(docs_url)
+    pattern = _version_pattern(version)
+
+    for path in CHANGELOG_FILES:
+        url = GITHUB_RAW.format(owner=owner, repo=repo, path=path)
+        text = _get_page(session, url)
+        if text is None:
+            continue
+
+        lines = text.splitlines()
+        headings = []  # (line index, level, title)
+        for i, line in enumerate(lines):
+            md = re.match(r"(#{1,6})\s+(.*)", line)
+            if md:
+                headings.append((i, len(md.group(1)), md.group(2).strip()))
+            elif (i + 1 < len(lines) and line.strip()
+                  and re.fullmatch(r"([=\-~^])\1{2,}", lines[i + 1].strip())):
+                # reStructuredText: underline character sets the level
+                headings.append((i, "=-~^".index(lines[i + 1].strip()[0]) + 1, line.strip()))
+
+        for n, (i, level, title) in enumerate(headings):
+            if not pattern.search(title):
+                continue
+            end = next((j for j, lvl, _t in headings[n + 1:] if lvl <= level), len(lines))
+            items = _summarise_lines(lines[i + 1:end])
+            if items:
+                source = f"https://github.com/{owner}/{repo}/blob/HEAD/{path}"
+                return f"Source: {source}\n\n### {title}\n" + "\n".join(items)
+    return None
+
+
+def readthedocs_notes(docs_url: str, version: str, session) -> Optional[str]:
+    """The section headed by version on a readthedocs changelog page."""
+    pattern = _version_pattern(version)
+    for page in RTD_CHANGELOG_PAGES:
+        url = docs_url.rstrip("/") + "/" + page
+        html = _get_page(session, url)
+        if html is None:
+            continue
+        sections = extract_sections([html], RTD_CONTAINERS, [], match=pattern.search, max_sections=1)
+        if sections:
+            return f"Source: {url}\n\n" + sections[0]
+    return None
+
+
+CHANGELOG_ADAPTERS = [
+    # (name, applies to docs_url?, adapter)
+    ("github-releases", lambda url: github_repo(url) is not None, github_release_notes),
+    ("changelog-file", lambda url: github_repo(url) is not None, changelog_file_notes),
+    ("readthedocs", lambda url: ".readthedocs.io" in url, readthedocs_notes),
+]
+
+
+def scrape_package_changelog(name: str, version: str, docs_url: str, session=None) -> str:
+    """Scrape the changelog entry for a generic package.
+
+    Tries each applicable adapter from CHANGELOG_ADAPTERS in order and
+    falls back to pointing at the docs.
+    """
+    if session is None:
+        session = make_session()
+        if session is None:
+            return f"See: {docs_url}"
+
+    for adapter_name, applies, adapter in CHANGELOG_ADAPTERS:
+        if not docs_url or not applies(docs_url):
+            continue
+        try:
+            notes = adapter(docs_url, version, session)
+        except Exception:
+            continue  # Try the next adapter
+        if notes:
+            return notes
+    return f"See: {docs_url}"
+
+
+# ---------------------------------------------------------------------------
+# Release-notes cache
+# ---------------------------------------------------------------------------
+
+def _cache_path(package: str, version: str) -> Path:
+    safe = re.sub(r"[^\w.-]", "_", package)
+    return NOTES_CACHE_DIR / safe / f"{version}.v{EXTRACTOR_VERSION}.json"
+
+
+def cached_notes(package: str, version: str, extract) -> str:
+    """Return notes for (package, version) from the cache, or extract and store.
+
+    Only successful extractions (those starting with "Source: ") are
+    stored, so network errors and missing pages are retried next run.
+    """
+    path = _cache_path(package, version)
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["notes"]
+    except (OSError, json.JSONDecodeError, KeyError):
+        pass
+
+    notes = extract()
+    if notes.startswith("Source: "):
+        entry = {
+            "package": package,
+            "version": version,
+            "extractor": EXTRACTOR_VERSION,
+            "fetched": date.today().isoformat(),
+            "notes": notes,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    return notes
+
+
+def fetch_notes(name: str, version: str, docs_url: str, session) -> str:
+    """Release notes for one release, served from the cache when possible."""
+    if name == "Django":
+        return cached_notes(name, version, lambda: scrape_django_release_notes(version, session))
+    if name == "Python":
+        # One What's New page per minor release
+        short_ver = ".".join(version.split(".")[:2])
+        return cached_notes(name, short_ver, lambda: scrape_python_whatsnew(version, session))
+    return cached_notes(name, version, lambda: scrape_package_changelog(name, version, docs_url, session))
+
+
+def _version_key(v: str) -> tuple:
+    return tuple(int(x) for x in v.split("."))
+
+
+def versions_in_range(upd: dict) -> list[str]:
+    """Releases after tracked up to latest (newest first, capped).
+
+    The release list comes from the update's registry (PyPI or npm). Python's What's New is cumulative per minor release, so only the latest
+    is used. Falls back to [latest] if the release list can't be fetched.
+    """
+    if upd["name"] == "Python":
+        return [upd["latest"]]
+    try:
+        registry = upd.get("registry", "pypi")
+        releases = fetch_release_versions(upd.get(registry, upd["name"]), registry)
+        low, high = _version_key(upd["tracked"]), _version_key(upd["latest"])
+    except Exception:
+        return [upd["latest"]]
+    versions = sorted((v for v in releases if low < _version_key(v) <= high), key=_version_key, reverse=True)
+    return versions[:MAX_NOTES_VERSIONS] or [upd["latest"]]
+
+
+def fetch_release_notes(selected: list[dict]) -> dict[str, str]:
+    """Fetch release notes for every release covered by the selected updates.
+
+    Two concurrent stages share one thread pool and one requests.Session:
+    list the releases between tracked and latest for every package, then
+    fetch every (package, version) at once. Results keep the order of
+    selected regardless of which page finishes first.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    session = make_session()
+
+    try:
+        with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as pool:
+            ranges = list(pool.map(versions_in_range, selected))
+            for upd, versions in zip(selected, ranges):
+                shown = ", ".join(versions)
+                print(f"  Fetching: {upd['name']} {shown}...")
+
+            tasks = [(upd, v) for upd, versions in zip(selected, ranges) for v in versions]
+            results = list(pool.map(
+                lambda task: fetch_notes(task[0]["name"], task[1], task[0].get("docs_url", ""), session),
+                tasks,
+            ))
+    finally:
+        if session is not None:
+            session.close()
+
+    by_update: dict[int, list[str]] = {}
+    for (upd, _version), notes in zip(tasks, results):
+        by_update.setdefault(id(upd), []).append(notes)
+
+    release_notes = {}
+    for upd in selected:
+        notes = by_update.get(id(upd), [])
+        found = [n for n in notes if n.startswith("Source: ")]
+        text = "\n\n".join(found) if found else (notes[0] if notes else "")
+        if text:
+            release_notes[f"{upd['name']} {upd['tracked']} -> {upd['latest']}"] = text
+    return release_notes
+
+
+def warm_cache(package: str, low: str, high: str, info: Optional[dict] = None) -> None:
+    """Fetch and cache release notes for every release in [low, high].
+
+    info is the package's versions.json entry, for its PyPI name and
+    docs_url. low and high must be final releases (STABLE_VERSION).
+    """
+    key = _version_key
+    info = info or {}
+
+    try:
+        versions = fetch_release_versions(info.get("pypi", package))
+    except Exception as e:
+        print(f"  ERROR: Could not list {package} releases: {e}")
+        sys.exit(1)
+
+    selected = sorted((v for v in versions if key(low) <= key(v) <= key(high)), key=key)
+    if package == "Python":
+        # What's New is per minor release; warm each page once
+        selected = list(dict.fromkeys(".".join(v.split(".")[:2]) for v in selected))
+    if not selected:
+        print(f"  No {package} releases between {low} and {high}.")
+        return
+
+    print(f"\n  Warming cache for {len(selected)} {package} release(s)...\n")
+    from concurrent.futures import ThreadPoolExecutor
+
+    session = make_session()
+    try:
+        with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as pool:
+            results = list(pool.map(lambda v: fetch_notes(package, v, info.get("docs_url", ""), session), selected))
+    finally:
+        if session is not None:
+            session.close()
+
+    cached = 0
+    for version, notes in zip(selected, results):
+        ok = notes.startswith("Source: ")
+        cached += ok
+        print(f"  {'[CACHED]' if ok else '[FAILED]'} {package} {version}")
+    print(f"\n  {cached}/{len(selected)} release(s) cached in {NOTES_CACHE_DIR}")
+
+
+# ---------------------------------------------------------------------------
+# Updating files
+# ---------------------------------------------------------------------------
+
+NOTES_MARKER = "\n---\n\n## Version Update Notes"
+
+
+def append_release_notes(skill: dict, release_notes: dict[str, str]) -> None:
+    """Replace the "Version Update Notes" section at the end of SKILL.md."""
+    skill_file = skill["skill_file"]
+    if not skill_file.exists():
+        print(f"  ERROR: {skill_file} not found.")
+        return
+
+    content = skill_file.read_text(encoding="utf-8")
+
+    # Remove old "Version Update Notes" section if it exists
+    if NOTES_MARKER in content:
+        content = content[: content.index(NOTES_MARKER)]
+
+    # Append release notes section
+    if release_notes:
+        notes_section = NOTES_MARKER + "\n\n"
+        notes_section += f"*Last checked: {date.today().isoformat()}*\n\n"
+
+        for pkg_name, notes in release_notes.items():
+            notes_section += f"### {pkg_name}\n\n{notes}\n\n"
+
+        content += notes_section
+
+    skill_file.write_text(content, encoding="utf-8")
+
+    # The notes section changes SKILL.md's size, so re-record the index
+    if load_index(skill) is not None:
+        write_index(skill, build_index(skill))
@@ -0,0 +1,220 @@
+"""
+Registry clients: npm, PyPI and python.org.
+
+Every request goes through fetch_json(), which retries transient failures
+with jittered backoff, trips a per-host circuit breaker after repeated
+failed lookups, and honours a global deadline set with set_deadline().
+Responses of an unexpected shape raise FetchError like any other failure.
+"""
+
+import json
+import random
+import re
+import time
+import urllib.parse
+from typing import Optional
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+NPM_URL = "https://registry.npmjs.org/{package}/latest"
+NPM_PACKUMENT_URL = "https://registry.npmjs.org/{package}"
+NPM_ABBREVIATED = "application/vnd.npm.install-v1+json"  # Versions without READMEs
+PYPI_URL = "https://pypi.org/pypi/{package}/json"
+PYTHON_VERSIONS_URL = "https://www.python.org/api/v2/downloads/release/?is_published=true"
+
+REQUEST_TIMEOUT = 10       # Seconds per HTTP request (capped by --deadline)
+MAX_ATTEMPTS = 3           # Tries per lookup before giving up
+BACKOFF_BASE = 0.5         # Seconds; doubled per retry, full jitter applied
+BREAKER_THRESHOLD = 3      # Consecutive failed lookups before a host is skipped
+BREAKER_COOLDOWN = 60      # Seconds a tripped host stays skipped
+
+STABLE_VERSION = re.compile(r"\d+(\.\d+)*")  # A final release: numbers only, no rc/dev/post
+
+
+# ---------------------------------------------------------------------------
+# Resilient HTTP (circuit breaker, retries, global deadline)
+# ---------------------------------------------------------------------------
+
+class FetchError(Exception):
+    """A version lookup failed. The message is shown in the status table."""
+
+
+class FetchSkipped(FetchError):
+    """A version lookup was not attempted (deadline reached or host tripped)."""
+
+
+_deadline: Optional[float] = None
+_host_failures: dict[str, int] = {}
+_host_open_until: dict[str, float] = {}
+
+
+def set_deadline(seconds: Optional[float]) -> None:
+    """Set a wall-clock budget for all lookups in this run (None = unlimited)."""
+    global _deadline
+    _deadline = None if seconds is None else time.monotonic() + seconds
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the global deadline, or None if there is none."""
+    if _deadline is None:
+        return None
+    return _deadline - time.monotonic()
+
+
+def _check_host(host: str) -> None:
+    """Raise FetchSkipped if the deadline passed or the host's breaker is open."""
+    remaining = time_remaining()
+    if remaining is not None and remaining <= 0:
+        raise FetchSkipped("deadline reached")
+
+    open_until = _host_open_until.get(host)
+    if open_until is None:
+        return
+    if time.monotonic() < open_until:
+        raise FetchSkipped(f"{host} unavailable (circuit open)")
+    # Cooldown over: half-open, allow a single probe request through
+    del _host_open_until[host]
+    _host_failures[host] = BREAKER_THRESHOLD - 1
+
+
+def _record_failure(host: str) -> None:
+    _host_failures[host] = _host_failures.get(host, 0) + 1
+    if _host_failures[host] >= BREAKER_THRESHOLD:
+        _host_open_until[host] = time.monotonic() + BREAKER_COOLDOWN
+
+
+def _record_success(host: str) -> None:
+    _host_failures.pop(host, None)
+    _host_open_until.pop(host, None)
+
+
+def fetch_json(url: str, accept: str = "application/json"):
+    """GET a JSON document with retries, jittered backoff and a per-host breaker.
+
+    A lookup that fails after all its retries counts once against the
+    host's breaker. Raises FetchError (or FetchSkipped) with a short
+    human-readable reason.
+    """
+    # Imported here: urllib.request pulls in http.client and ssl, which
+    # offline modes and status-file reads never need
+    import urllib.error
+    import urllib.request
+
+    host = urllib.parse.urlsplit(url).hostname or url
+    reason = "no attempt made"
+
+    for attempt in range(MAX_ATTEMPTS):
+        _check_host(host)
+        remaining = time_remaining()
+        timeout = REQUEST_TIMEOUT if remaining is None else min(REQUEST_TIMEOUT, remaining)
+
+        try:
+            req = urllib.request.Request(url, headers={"Accept": accept})
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                data = json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            if 400 <= e.code < 500 and e.code != 429:
+                # The host answered; the package is the problem. Don't retry.
+                _record_success(host)
+                raise FetchError(f"HTTP {e.code}") from None
+            reason = f"HTTP {e.code}"
+        except urllib.error.URLError as e:
+            reason = str(e.reason)
+        except (OSError, ValueError) as e:
+            reason = str(e) or type(e).__name__
+        else:
+            _record_success(host)
+            return data
+
+        if attempt + 1 < MAX_ATTEMPTS:
+            delay = random.uniform(0, BACKOFF_BASE * 2 ** attempt)
+            remaining = time_remaining()
+            if remaining is not None:
+                delay = min(delay, max(remaining, 0))
+            time.sleep(delay)
+
+    _record_failure(host)
+    raise FetchError(reason)
+
+
+def _field(data, *keys, kind: type = str):
+    """data[keys[0]][keys[1]]..., raising FetchError unless it exists and is a kind."""
+    try:
+        for key in keys:
+            data = data[key]
+    except (KeyError, IndexError, TypeError):
+        data = None
+    if not isinstance(data, kind):
+        raise FetchError("unexpected response")
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Version fetching
+# ---------------------------------------------------------------------------
+
+def fetch_npm_version(package_name: str) -> Optional[str]:
+    """Fetch latest version from npm registry."""
+    return _field(fetch_json(NPM_URL.format(package=package_name)), "version")
+
+
+def fetch_pypi_version(package_name: str) -> Optional[str]:
+    """Fetch latest version from PyPI."""
+    return _field(fetch_json(PYPI_URL.format(package=package_name)), "info", "version")
+
+
+def fetch_latest_python_version() -> Optional[str]:
+    """Fetch latest stable Python version from python.org API."""
+    stable = fetch_python_releases()
+    if stable:
+        stable.sort(
+            key=lambda v: tuple(int(x) for x in v.split(".")),
+            reverse=True,
+        )
+        return stable[0]
+    return None
+
+
+def fetch_python_releases() -> list[str]:
+    """All stable Python release versions listed on python.org."""
+    data = fetch_json(PYTHON_VERSIONS_URL)
+    if not isinstance(data, list):
+        raise FetchError("unexpected response")
+    stable = []
+    for release in data:
+        name = release.get("name") if isinstance(release, dict) else None
+        match = re.match(r"Python (\d+\.\d+\.\d+)$", name) if isinstance(name, str) else None
+        if match:
+            stable.append(match.group(1))
+    return stable
+
+
+def fetch_release_versions(package: str, registry: str = "pypi") -> list[str]:
+    """All stable (purely numeric) released versions of a PyPI or npm package."""
+    if package == "Python":
+        versions = fetch_python_releases()
+    elif registry == "npm":
+        data = fetch_json(NPM_PACKUMENT_URL.format(package=package), accept=NPM_ABBREVIATED)
+        versions = list(_field(data, "versions", kind=dict))
+    else:
+        versions = list(_field(fetch_json(PYPI_URL.format(package=package)), "releases", kind=dict))
+    return [v for v in versions if STABLE_VERSION.fullmatch(v)]
+
+
+def fetch_version(package_name: str, registry: str, pkg_info: dict) -> Optional[str]:
+    """Fetch latest version from the appropriate registry.
+
+    Raises FetchError if the lookup failed or was skipped.
+    """
+    if package_name == "Python":
+        return fetch_latest_python_version()
+
+    if registry == "npm":
+        npm_name = pkg_info.get("npm", package_name)
+        return fetch_npm_version(npm_name)
+    else:
+        pypi_name = pkg_info.get("pypi", package_name)
+        return fetch_pypi_version(pypi_name)
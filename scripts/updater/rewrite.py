@@ -0,0 +1,332 @@
+"""
+Version rewriting and the per-skill version-reference index.
+"""
+
+import bisect
+import itertools
+import json
+import re
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from updater import DOCS_DIR, REPO_ROOT
+from updater.skills import update_versions_json
+
+
+# ---------------------------------------------------------------------------
+# Single-pass rewriter
+# ---------------------------------------------------------------------------
+
+# Anchors for version references. A table anchor is a "|" followed by a
+# name cell and a value cell on the same line (captured via lookahead so
+# adjacent cells can still anchor their own matches); other anchors are
+# "@" or "/" followed by something that looks like the start of a version.
+_TABLE_ANCHOR = r"\|(?=[ \t]*(?P<cell>[^|\n]*?)[ \t]*\|[ \t]*(?P<value>[^|\n]*?)[ \t]*\|)"
+_SEP_ANCHOR = r"[@/](?=[{first}])"
+
+
+def iter_version_refs(content: str, updates: list[dict]):
+    """Yield (update, kind, start, end) for every version reference in content.
+
+    Recognises, for each package:
+      | name | old |    kind "table" (only the version cell is the span)
+      name@old          kind "cdn"   (CDN / npm specifiers)
+      name/old          kind "path"  (import maps and URL paths)
+
+    Spans are character offsets of the tracked version string and never
+    overlap; they are yielded in order.
+    """
+    if not updates:
+        return
+
+    by_name = {upd["name"]: upd for upd in updates}
+    first_chars = "".join(sorted({re.escape(u["tracked"][:1]) for u in updates}))
+    scanner = re.compile(_TABLE_ANCHOR + "|" + _SEP_ANCHOR.format(first=first_chars))
+
+    pos = 0
+    for m in scanner.finditer(content):
+        if m.group("cell") is not None:
+            upd = by_name.get(m.group("cell"))
+            if upd is None or m.group("value") != upd["tracked"]:
+                continue
+            kind = "table"
+            start, end = m.span("value")
+        else:
+            at = m.start()
+            for upd in updates:
+                if (content.startswith(upd["tracked"], at + 1)
+                        and content.endswith(upd["name"], 0, at)):
+                    break
+            else:
+                continue
+            kind = "cdn" if content[at] == "@" else "path"
+            start, end = at + 1, at + 1 + len(upd["tracked"])
+
+        if start < pos:
+            continue  # Overlaps a reference that was already found
+        pos = end
+        yield upd, kind, start, end
+
+
+def rewrite_versions(content: str, updates: list[dict]) -> tuple[str, dict[str, int]]:
+    """Apply every version substitution in a single pass over content.
+
+    Returns the new content and a per-package replacement count.
+    """
+    counts = {upd["name"]: 0 for upd in updates}
+    pieces = []
+    pos = 0
+    for upd, _kind, start, end in iter_version_refs(content, updates):
+        pieces.append(content[pos:start])
+        pieces.append(upd["latest"])
+        pos = end
+        counts[upd["name"]] += 1
+
+    pieces.append(content[pos:])
+    return "".join(pieces), counts
+
+
+def update_references(skill: dict, updates: list[dict]) -> dict[str, int]:
+    """Update version references in every file of indexed_files(skill).
+
+    Files without a reference are left untouched. Returns the number of
+    references rewritten per package.
+    """
+    counts = {upd["name"]: 0 for upd in updates}
+    for path in indexed_files(skill):
+        content = path.read_text(encoding="utf-8")
+        new_content, file_counts = rewrite_versions(content, updates)
+        if new_content != content:
+            path.write_text(new_content, encoding="utf-8")
+        for name, count in file_counts.items():
+            counts[name] += count
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Version-reference index
+# ---------------------------------------------------------------------------
+#
+# versions.index.json records where each tracked package's version string
+# appears (file, line, byte offset, kind). Updates then rewrite only those
+# spans, and --verify checks them without rescanning any file.
+
+INDEX_NAME = "versions.index.json"
+
+
+def index_path(skill: dict) -> Path:
+    return skill["dir"] / INDEX_NAME
+
+
+def indexed_files(skill: dict) -> list[Path]:
+    """Markdown files that may hold a skill's version references: its own and docs/."""
+    files = sorted(skill["dir"].rglob("*.md"))
+    if DOCS_DIR.exists():
+        files += sorted(DOCS_DIR.glob("*.md"))
+    return files
+
+
+def build_index(skill: dict) -> dict:
+    """Scan a skill's markdown files (and docs/) for tracked version strings.
+
+    Shared docs/ files are only recorded when they reference one of the
+    skill's packages, so updating another skill's docs does not make this
+    index look stale.
+    """
+    packages = skill["data"].get("packages", {})
+    tracked = [
+        {"name": name, "tracked": info["version"]}
+        for name, info in packages.items() if info.get("version")
+    ]
+
+    files = {}
+    refs: dict[str, list[dict]] = {name: [] for name in packages}
+    for path in indexed_files(skill):
+        content = path.read_text(encoding="utf-8")
+        rel = path.relative_to(REPO_ROOT).as_posix()
+        found = False
+
+        # Convert character offsets to byte offsets and line numbers
+        # incrementally so the scan stays linear in the file size.
+        char_pos = byte_pos = 0
+        line = 1
+        for upd, kind, start, _end in iter_version_refs(content, tracked):
+            chunk = content[char_pos:start]
+            byte_pos += len(chunk.encode("utf-8"))
+            line += chunk.count("\n")
+            char_pos = start
+            found = True
+            refs[upd["name"]].append({
+                "file": rel,
+                "line": line,
+                "offset": byte_pos,
+                "kind": kind,
+                "version": upd["tracked"],
+            })
+        if found or not path.is_relative_to(DOCS_DIR):
+            files[rel] = {"size": path.stat().st_size}
+
+    return {
+        "generated": date.today().isoformat(),
+        "files": files,
+        "packages": refs,
+    }
+
+
+def write_index(skill: dict, index: dict) -> None:
+    with open(index_path(skill), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def load_index(skill: dict) -> Optional[dict]:
+    path = index_path(skill)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"  WARNING: Could not read {path}: {e}")
+        return None
+
+
+def verify_index(skill: dict, index: dict) -> list[str]:
+    """Check every indexed span still holds the tracked version.
+
+    Reads only the indexed bytes (plus one stat per file), so the cost is
+    proportional to the number of references, not the size of the files.
+    Returns a list of human-readable problems.
+    """
+    problems = []
+    packages = skill["data"].get("packages", {})
+
+    for rel, meta in index.get("files", {}).items():
+        path = REPO_ROOT / rel
+        if not path.exists():
+            problems.append(f"{rel}: file missing")
+        elif path.stat().st_size != meta.get("size"):
+            problems.append(f"{rel}: changed since indexing (re-run --index)")
+
+    for name, refs in index.get("packages", {}).items():
+        tracked = packages.get(name, {}).get("version")
+        if tracked is None:
+            problems.append(f"{name}: indexed but no longer tracked")
+            continue
+        expected = tracked.encode("utf-8")
+        for ref in refs:
+            where = f"{ref['file']}:{ref['line']} ({ref['kind']})"
+            if ref["version"] != tracked:
+                problems.append(f"{name}: {where} indexed as {ref['version']}, tracked is {tracked}")
+                continue
+            try:
+                with open(REPO_ROOT / ref["file"], "rb") as f:
+                    f.seek(ref["offset"])
+                    found = f.read(len(expected))
+            except OSError:
+                continue  # Already reported as a missing file
+            if found != expected:
+                problems.append(f"{name}: {where} expected {tracked}, found {found.decode('utf-8', 'replace')!r}")
+
+    for name in packages:
+        if name not in index.get("packages", {}):
+            problems.append(f"{name}: tracked but not indexed (re-run --index)")
+
+    return problems
+
+
+def apply_indexed_updates(skill: dict, index: dict, updates: list[dict]) -> Optional[dict[str, int]]:
+    """Rewrite only the indexed spans for each update, then shift the index.
+
+    Returns per-package counts, or None if the index no longer describes
+    the files: an indexed file changed size, the skill gained or lost a
+    markdown file, a docs/ file outside the index now holds a reference, or
+    a span no longer matches its indexed version. The caller should then
+    fall back to a full scan.
+    """
+    indexed = index.get("files", {})
+    for rel, meta in indexed.items():
+        try:
+            if (REPO_ROOT / rel).stat().st_size != meta.get("size"):
+                return None
+        except OSError:
+            return None
+    for path in indexed_files(skill):
+        rel = path.relative_to(REPO_ROOT).as_posix()
+        if rel in indexed:
+            continue
+        if not path.is_relative_to(DOCS_DIR):
+            return None  # Added to the skill since indexing
+        if next(iter_version_refs(path.read_text(encoding="utf-8"), updates), None) is not None:
+            return None  # A shared doc that started referencing these packages
+
+    by_file: dict[str, list[tuple[dict, dict]]] = {}
+    for upd in updates:
+        for ref in index["packages"].get(upd["name"], []):
+            by_file.setdefault(ref["file"], []).append((ref, upd))
+
+    # Validate every span first so a drifted index never half-applies
+    contents = {}
+    for rel, pairs in by_file.items():
+        data = (REPO_ROOT / rel).read_bytes()
+        for ref, upd in pairs:
+            old = upd["tracked"].encode("utf-8")
+            if ref["version"] != upd["tracked"] or data[ref["offset"]:ref["offset"] + len(old)] != old:
+                return None
+        contents[rel] = data
+
+    counts = {upd["name"]: 0 for upd in updates}
+    for rel, pairs in by_file.items():
+        data = contents[rel]
+        pieces = []
+        pos = 0
+        for ref, upd in sorted(pairs, key=lambda p: p[0]["offset"]):
+            start = ref["offset"]
+            pieces.append(data[pos:start])
+            pieces.append(upd["latest"].encode("utf-8"))
+            pos = start + len(upd["tracked"].encode("utf-8"))
+            counts[upd["name"]] += 1
+        pieces.append(data[pos:])
+        new_data = b"".join(pieces)
+        (REPO_ROOT / rel).write_bytes(new_data)
+
+        # Shift offsets of every reference in this file (any package) by
+        # the total length change of the edits that precede it
+        edits = sorted(
+            (ref["offset"], len(upd["latest"].encode("utf-8")) - len(upd["tracked"].encode("utf-8")))
+            for ref, upd in pairs
+        )
+        edit_offsets = [at for at, _delta in edits]
+        shifts = list(itertools.accumulate((delta for _at, delta in edits), initial=0))
+        for refs in index["packages"].values():
+            for ref in refs:
+                if ref["file"] == rel:
+                    ref["offset"] += shifts[bisect.bisect_left(edit_offsets, ref["offset"])]
+        index["files"][rel]["size"] = len(new_data)
+
+    for ref, upd in (pair for pairs in by_file.values() for pair in pairs):
+        ref["version"] = upd["latest"]
+
+    write_index(skill, index)
+    return counts
+
+
+def apply_updates(skill: dict, updates: list[dict]) -> dict[str, int]:
+    """Write updates to versions.json and every version reference.
+
+    Uses the skill's index when present (falling back to a full scan of
+    indexed_files() if it has drifted, then rebuilding it). Returns the
+    number of references rewritten per package.
+    """
+    index = load_index(skill)
+    counts = None
+    if index is not None:
+        counts = apply_indexed_updates(skill, index, updates)
+        if counts is None:
+            print(f"    [{skill['name']}] index is stale, falling back to a full scan")
+    update_versions_json(skill, updates)
+    if counts is None:
+        counts = update_references(skill, updates)
+        if index is not None:
+            write_index(skill, build_index(skill))
+    return counts
@@ -0,0 +1,58 @@
+"""
+Skill discovery and versions.json updates.
+"""
+
+import json
+from datetime import date
+
+from updater import SKILLS_DIR
+
+
+# ---------------------------------------------------------------------------
+# Discovery
+# ---------------------------------------------------------------------------
+
+def find_versioned_skills() -> list[dict]:
+    """Find all skills that have a versions.json file."""
+    skills = []
+    for versions_file in sorted(SKILLS_DIR.glob("*/versions.json")):
+        skill_dir = versions_file.parent
+        skill_name = skill_dir.name
+        skill_file = skill_dir / "SKILL.md"
+
+        try:
+            data = json.loads(versions_file.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"  WARNING: Could not read {versions_file}: {e}")
+            continue
+
+        skills.append({
+            "name": skill_name,
+            "dir": skill_dir,
+            "versions_file": versions_file,
+            "skill_file": skill_file,
+            "data": data,
+            "registry": data.get("registry", "pypi"),
+        })
+
+    return skills
+
+
+# ---------------------------------------------------------------------------
+# Updating files
+# ---------------------------------------------------------------------------
+
+def update_versions_json(skill: dict, updates: list[dict]) -> None:
+    """Update versions.json with new versions."""
+    data = skill["data"]
+    packages = data["packages"]
+
+    for upd in updates:
+        if upd["name"] in packages:
+            packages[upd["name"]]["version"] = upd["latest"]
+
+    data["last_updated"] = date.today().isoformat()
+
+    with open(skill["versions_file"], "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
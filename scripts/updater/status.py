@@ -0,0 +1,129 @@
+"""
+Background refresh of version status.
+
+--refresh-status (one shot, for cron / Task Scheduler) and --daemon (loop)
+look up every package and atomically publish the results to STATUS_FILE.
+--check and install-skills.py read that file instead of hitting the
+network; --live forces a fresh lookup. A lock file keeps concurrent
+refreshes from duplicating work.
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from updater.compare import fetch_skill_status
+from updater.registry import set_deadline, time_remaining
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+STATUS_FILE = Path.home() / ".claude" / "skill-versions-status.json"
+LOCK_FILE = STATUS_FILE.with_suffix(".lock")
+STATUS_MAX_AGE = 24 * 3600      # Seconds before --check ignores the status file
+REFRESH_DEADLINE = 300          # Seconds a single refresh may take
+REFRESH_INTERVAL = 6 * 3600     # Default --daemon interval
+LOCK_STALE_AFTER = 2 * REFRESH_DEADLINE
+
+
+def acquire_lock() -> bool:
+    """Take the refresh lock. Returns False if another refresh holds it."""
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - LOCK_FILE.stat().st_mtime
+            except FileNotFoundError:
+                continue  # Released between our open and stat; try again
+            if age < LOCK_STALE_AFTER:
+                return False
+            # A refresh can't legitimately take this long; its owner died
+            LOCK_FILE.unlink(missing_ok=True)
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def release_lock() -> None:
+    LOCK_FILE.unlink(missing_ok=True)
+
+
+def write_status(status: dict) -> None:
+    """Write the status file atomically (temp file + rename)."""
+    STATUS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=STATUS_FILE.parent, prefix=STATUS_FILE.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(status, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp_path, STATUS_FILE)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def read_status(max_age: Optional[float] = STATUS_MAX_AGE) -> Optional[dict]:
+    """Read the published status, or None if missing, unreadable or too old."""
+    try:
+        status = json.loads(STATUS_FILE.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if max_age is not None and time.time() - status.get("checked_at", 0) > max_age:
+        return None
+    return status
+
+
+def refresh_status(skills: list[dict]) -> Optional[dict]:
+    """Look up every package and publish the results.
+
+    Bounded by REFRESH_DEADLINE unless the caller already set a deadline
+    (--deadline). Returns the new status, or None if another refresh is
+    already running.
+    """
+    if not acquire_lock():
+        return None
+    own_deadline = time_remaining() is None
+    try:
+        if own_deadline:
+            set_deadline(REFRESH_DEADLINE)
+        status = {
+            "checked_at": time.time(),
+            "checked": datetime.now().isoformat(timespec="seconds"),
+            "skills": {s["name"]: fetch_skill_status(s) for s in skills},
+        }
+        # Merge so a --skill refresh doesn't drop other skills' results
+        previous = read_status(max_age=None)
+        if previous:
+            status["skills"] = {**previous.get("skills", {}), **status["skills"]}
+        write_status(status)
+        return status
+    finally:
+        if own_deadline:
+            set_deadline(None)
+        release_lock()
+
+
+def run_daemon(skills: list[dict], interval: float) -> None:
+    """Refresh the status file every interval seconds until interrupted."""
+    print(f"\n  Refreshing {STATUS_FILE} every {interval:.0f}s (Ctrl+C to stop)")
+    try:
+        while True:
+            status = refresh_status(skills)
+            stamp = datetime.now().strftime("%H:%M:%S")
+            if status is None:
+                print(f"  [{stamp}] another refresh is running, skipped")
+            else:
+                print(f"  [{stamp}] status refreshed")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n  Stopped.")
@@ -0,0 +1,90 @@
+"""
+Content-addressed cache of synthesized utterances for speak.py.
+
+Each MP3 is stored under a hash of everything that changes the audio:
+the normalized text plus voice, rate, volume and pitch. Hits refresh the
+file's mtime, and once the cache outgrows MAX_BYTES the least recently
+used files are evicted.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+CACHE_DIR = Path.home() / ".claude" / "cache" / "jarvis-audio"
+MAX_BYTES = 50 * 1024 * 1024
+
+
+def cache_key(text: str, voice: str, rate: str, volume: str, pitch: str) -> str:
+    """Hash of the whitespace-normalized text and the voice settings."""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    material = "\0".join((normalized, voice, rate, volume, pitch))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def lookup(key: str) -> Optional[Path]:
+    """The cached MP3 for key, marked as just used, or None."""
+    path = CACHE_DIR / f"{key}.mp3"
+    try:
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def store(key: str, audio: bytes) -> Path:
+    """Write audio under key atomically, then evict down to MAX_BYTES."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / f"{key}.mp3"
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    evict(keep=path)
+    return path
+
+
+def evict(max_bytes: int = MAX_BYTES, keep: Optional[Path] = None) -> int:
+    """Delete least recently used entries until the cache fits max_bytes.
+
+    Returns the number of files removed. keep is never removed.
+    """
+    entries = []
+    total = 0
+    try:
+        with os.scandir(CACHE_DIR) as it:
+            for entry in it:
+                if not entry.name.endswith(".mp3"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue  # Evicted by another process
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+    except OSError:
+        return 0
+
+    removed = 0
+    for _mtime, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and path == str(keep):
+            continue
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Offline phrase pack - prebuilt audio for JARVIS's stock phrases.
+
+Renders every phrase in phrases.txt with the default voice settings into a
+single pack file: a small header, a JSON offset table, then the MP3s back
+to back. speak.py memory-maps the pack and plays a matching phrase
+straight from it, with no network and no synthesis.
+
+Usage:
+    python phrase_pack.py build                       # Render phrases.txt
+    python phrase_pack.py build --phrases my-phrases.txt
+    python phrase_pack.py list                        # Show what's in the pack
+
+Pack layout:
+    MAGIC (8 bytes) | index length (4 bytes, little-endian) | JSON index | audio
+The index records the voice settings and, per phrase key, the audio's
+offset (from the start of the audio section) and length.
+"""
+
+import json
+import os
+import re
+import struct
+import sys
+from pathlib import Path
+from typing import Optional
+
+PACK_FILE = Path.home() / ".claude" / "jarvis-phrases.pack"
+PHRASES_FILE = Path(__file__).parent / "phrases.txt"
+MAGIC = b"JVPACK01"
+HEADER = struct.Struct("<8sI")
+BUILD_WORKERS = 4   # Concurrent synthesis requests while building
+
+
+def phrase_key(text: str) -> str:
+    """Match key: case-folded words, ignoring punctuation and pause marks."""
+    return " ".join(re.sub(r"[^\w' ]+", " ", text.casefold()).split())
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+_pack = None  # (file stamp, mmap, index, data offset), reopened if the file changes
+
+
+def _open_pack():
+    """Map the pack, reusing the mapping until the file is rebuilt."""
+    global _pack
+    st = os.stat(PACK_FILE)
+    stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if _pack is None or _pack[0] != stamp:
+        import mmap
+
+        with open(PACK_FILE, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_len = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{PACK_FILE} is not a phrase pack")
+        index = json.loads(mm[HEADER.size:HEADER.size + index_len])
+        _pack = (stamp, mm, index, HEADER.size + index_len)
+    return _pack[1:]
+
+
+def find(text: str, voice: str, rate: str, volume: str, pitch: str) -> Optional[memoryview]:
+    """The packed audio for text, or None.
+
+    Only matches when the pack was rendered with the same voice settings.
+    Costs a single stat when no pack has been built.
+    """
+    try:
+        mm, index, data_start = _open_pack()
+    except (OSError, ValueError, struct.error):
+        return None
+    if index.get("settings") != [voice, rate, volume, pitch]:
+        return None
+    entry = index["entries"].get(phrase_key(text))
+    if entry is None:
+        return None
+    offset, length = entry
+    return memoryview(mm)[data_start + offset:data_start + offset + length]
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+def load_phrases(path: Path) -> list[str]:
+    """One phrase per line; blank lines and # comments are skipped."""
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def build(phrases: list[str]) -> None:
+    """Render phrases with the default settings and write the pack."""
+    import asyncio
+    import tempfile
+
+    from speak import DEFAULT_PITCH, DEFAULT_RATE, DEFAULT_VOICE, DEFAULT_VOLUME, synthesize_bytes
+    from speech_text import add_natural_pauses
+
+    settings = [DEFAULT_VOICE, DEFAULT_RATE, DEFAULT_VOLUME, DEFAULT_PITCH]
+
+    # Unique keys only, keeping the first spelling of each phrase
+    unique = {}
+    for phrase in phrases:
+        unique.setdefault(phrase_key(phrase), phrase)
+
+    async def render_all():
+        limit = asyncio.Semaphore(BUILD_WORKERS)
+
+        async def render(phrase):
+            async with limit:
+                # Same preprocessing speak.py applies before synthesis
+                return await synthesize_bytes(add_natural_pauses(phrase), *settings, engine="edge")
+
+        return await asyncio.gather(*(render(p) for p in unique.values()))
+
+    print(f"  Rendering {len(unique)} phrase(s) with {DEFAULT_VOICE}...")
+    rendered = asyncio.run(render_all())
+
+    entries = {}
+    offset = 0
+    for key, audio in zip(unique, rendered):
+        entries[key] = [offset, len(audio)]
+        offset += len(audio)
+    index = json.dumps({"settings": settings, "entries": entries}).encode("utf-8")
+
+    PACK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=PACK_FILE.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(index)))
+            f.write(index)
+            for audio in rendered:
+                f.write(audio)
+        os.replace(tmp_path, PACK_FILE)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    print(f"  Wrote {PACK_FILE} ({len(entries)} phrases, {offset // 1024} KB of audio)")
+
+
+def list_pack() -> None:
+    try:
+        _mm, index, _data_start = _open_pack()
+    except (OSError, ValueError, struct.error):
+        print(f"  No phrase pack at {PACK_FILE} (run: python phrase_pack.py build)")
+        return
+    voice, rate, volume, pitch = index["settings"]
+    print(f"  {PACK_FILE}")
+    print(f"  Voice: {voice}  rate {rate}  volume {volume}  pitch {pitch}\n")
+    for key, (_offset, length) in index["entries"].items():
+        print(f"    {key:<45} {length / 1024:>6.1f} KB")
+
+
+def main():
+    action = sys.argv[1].lower() if len(sys.argv) > 1 else "list"
+
+    if action == "build":
+        path = PHRASES_FILE
+        if "--phrases" in sys.argv:
+            idx = sys.argv.index("--phrases")
+            if idx + 1 >= len(sys.argv):
+                print("Usage: python phrase_pack.py build [--phrases FILE]")
+                sys.exit(1)
+            path = Path(sys.argv[idx + 1])
+        build(load_phrases(path))
+    elif action == "list":
+        list_pack()
+    else:
+        print(f"Unknown action: {action}")
+        print("Usage: python phrase_pack.py [build [--phrases FILE]|list]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Audio playback backends for speak.py.
+
+Every backend plays an MP3 (or the WAV from a local TTS engine; mpg123
+can't play those, so "auto" skips it for them) from memory or from a file and blocks until
+playback has finished. It does that by waiting on the player process, not
+by sleeping for the clip's duration. It returns its start latency: the
+time from the call until the player was running and taking audio. If the
+optional cancel event is set, the player is killed within CANCEL_POLL
+and PlaybackCancelled reports how much had been played.
+
+    powershell      Windows: WPF MediaPlayer via PowerShell (file based)
+    mpv, ffplay,    MP3 piped straight to the player's stdin
+    mpg123
+    paplay, aplay   MP3 decoded by ffmpeg, PCM piped to PulseAudio / ALSA
+    null            Discards the audio (tests, benchmarks)
+    file:DIR        Writes each clip to DIR (tests, debugging)
+
+Usage:
+    python playback.py              # List backends and which are available
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import speech_metrics
+
+PLAYER_TIMEOUT = 120  # Seconds before a stuck player is killed
+CANCEL_POLL = 0.02    # Seconds between checks of the cancel event
+PLAY_MARGIN = 2       # Seconds past a clip's duration before PowerShell gives up on it
+
+# speak.py runs without a console when the Stop hook hands off to it (and
+# so does the speech service), so Windows would open a console window for
+# every player it starts.
+NO_WINDOW = {"creationflags": subprocess.CREATE_NO_WINDOW} if sys.platform == "win32" else {}
+
+# Decoded PCM for the pipe-to-sink backends (edge-tts MP3s are 24 kHz mono)
+PCM_RATE = 24000
+DECODE_TO_PCM = ["ffmpeg", "-loglevel", "quiet", "-i", "-", "-f", "s16le", "-ac", "1", "-ar", str(PCM_RATE), "-"]
+
+
+class PlayerUnavailable(RuntimeError):
+    pass
+
+
+class PlaybackCancelled(Exception):
+    """Playback was stopped early; played is the seconds already heard."""
+
+    def __init__(self, played: float):
+        super().__init__(f"playback cancelled after {played:.2f}s")
+        self.played = played
+
+
+class Backend:
+    """A way to play MP3 audio. Subclasses implement one of the play methods."""
+
+    name = ""
+    formats = (".mp3", ".wav")  # audio_suffix() values it can play
+
+    def available(self) -> bool:
+        return True
+
+    def play_bytes(self, audio: bytes, cancel: threading.Event = None) -> float:
+        with speech_metrics.stage("write"):
+            with tempfile.NamedTemporaryFile(suffix=audio_suffix(audio), delete=False) as tmp:
+                tmp.write(audio)
+                tmp_path = tmp.name
+        try:
+            return self.play_file(tmp_path, cancel)
+        finally:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def play_file(self, path: str, cancel: threading.Event = None) -> float:
+        with open(path, "rb") as f:
+            return self.play_bytes(f.read(), cancel)
+
+
+def audio_suffix(audio: bytes) -> str:
+    """File extension for the audio's format, for players that go by it."""
+    return ".wav" if bytes(audio[:4]) == b"RIFF" else ".mp3"
+
+
+def _kill(procs: list[subprocess.Popen]) -> None:
+    for proc in procs:
+        proc.kill()
+    for proc in procs:
+        proc.wait()
+
+
+def _wait(procs: list[subprocess.Popen], cancel: threading.Event = None, started: float = 0.0) -> None:
+    """Wait for the player (the last process) to exit.
+
+    Kills every process if cancel is set, raising PlaybackCancelled, or if
+    PLAYER_TIMEOUT passes.
+    """
+    deadline = time.monotonic() + PLAYER_TIMEOUT
+    player = procs[-1]
+    while True:
+        try:
+            player.wait(timeout=CANCEL_POLL if cancel is not None else PLAYER_TIMEOUT)
+            break
+        except subprocess.TimeoutExpired:
+            if cancel is not None and cancel.is_set():
+                _kill(procs)
+                raise PlaybackCancelled(time.perf_counter() - started) from None
+            if time.monotonic() >= deadline:
+                _kill(procs)
+                return
+    for proc in procs[:-1]:
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            _kill([proc])
+
+
+def _feed(pipe, audio: bytes) -> None:
+    try:
+        pipe.write(audio)
+        pipe.close()
+    except OSError:
+        pass  # Player exited or was killed; nothing left to play
+
+
+class PowerShellBackend(Backend):
+    """WPF MediaPlayer driven by PowerShell. It can only open a URI."""
+
+    name = "powershell"
+
+    # Prints "started" once Play() is called, so the caller can time it.
+    # Then it polls the position against the duration every 20 ms; the
+    # MediaEnded event needs a WPF dispatcher that a console host doesn't run.
+    # Each poll drains the dispatcher queue once so MediaFailed gets through,
+    # and playback stops PLAY_MARGIN seconds past the duration even if the
+    # position stalls.
+    SCRIPT = '''
+Add-Type -AssemblyName PresentationCore
+$dispatcher = [System.Windows.Threading.Dispatcher]::CurrentDispatcher
+$failed = $false
+$player = New-Object System.Windows.Media.MediaPlayer
+$player.add_MediaFailed({{ $script:failed = $true }})
+$player.Open([uri]"{path}")
+$player.Play()
+$started = Get-Date
+[Console]::Out.WriteLine("started")
+[Console]::Out.Flush()
+function Wait-Tick {{
+    $dispatcher.Invoke([Action]{{}}, [System.Windows.Threading.DispatcherPriority]::Background)
+    Start-Sleep -Milliseconds 20
+}}
+$deadline = $started.AddSeconds(5)
+while (-not $player.NaturalDuration.HasTimeSpan -and -not $failed -and (Get-Date) -lt $deadline) {{
+    Wait-Tick
+}}
+if ($player.NaturalDuration.HasTimeSpan -and -not $failed) {{
+    $end = $player.NaturalDuration.TimeSpan
+    $deadline = $started.Add($end).AddSeconds({margin})
+    while ($player.Position -lt $end -and -not $failed -and (Get-Date) -lt $deadline) {{
+        Wait-Tick
+    }}
+}}
+$player.Close()
+'''
+
+    def available(self) -> bool:
+        return sys.platform == "win32" and shutil.which("powershell") is not None
+
+    def play_file(self, path: str, cancel: threading.Event = None) -> float:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", self.SCRIPT.format(path=path, margin=PLAY_MARGIN)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            **NO_WINDOW,
+        )
+        proc.stdout.readline()
+        started = time.perf_counter()
+        proc.stdout.close()
+        _wait([proc], cancel, started)
+        return started - start
+
+
+class PipeBackend(Backend):
+    """A command-line player fed through stdin, optionally behind a decoder."""
+
+    def __init__(self, name: str, command: list[str], decoder: list[str] = None,
+                 formats: tuple[str, ...] = Backend.formats):
+        self.name = name
+        self.command = command
+        self.decoder = decoder
+        self.formats = formats
+
+    def available(self) -> bool:
+        commands = [self.command] + ([self.decoder] if self.decoder else [])
+        return all(shutil.which(cmd[0]) for cmd in commands)
+
+    def play_bytes(self, audio: bytes, cancel: threading.Event = None) -> float:
+        start = time.perf_counter()
+        quiet = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL, **NO_WINDOW}
+        if self.decoder:
+            decoder = subprocess.Popen(self.decoder, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                       stderr=subprocess.DEVNULL, **NO_WINDOW)
+            player = subprocess.Popen(self.command, stdin=decoder.stdout, **quiet)
+            decoder.stdout.close()  # The player holds the read end now
+            procs = [decoder, player]
+        else:
+            player = subprocess.Popen(self.command, stdin=subprocess.PIPE, **quiet)
+            procs = [player]
+        started = time.perf_counter()
+
+        # Feed from a thread: the write blocks while the player buffers, and
+        # cancellation must not wait for it
+        threading.Thread(target=_feed, args=(procs[0].stdin, audio), daemon=True).start()
+        _wait(procs, cancel, started)
+        return started - start
+
+
+class NullBackend(Backend):
+    """Discards the audio."""
+
+    name = "null"
+
+    def play_bytes(self, audio: bytes, cancel: threading.Event = None) -> float:
+        return 0.0
+
+    def play_file(self, path: str, cancel: threading.Event = None) -> float:
+        return 0.0
+
+
+class FileBackend(Backend):
+    """Writes each clip to a directory, numbered in playback order."""
+
+    def __init__(self, directory: str):
+        self.name = f"file:{directory}"
+        self.directory = directory
+        self.count = 0
+
+    def play_bytes(self, audio: bytes, cancel: threading.Event = None) -> float:
+        os.makedirs(self.directory, exist_ok=True)
+        self.count += 1
+        path = os.path.join(self.directory, f"{time.time_ns()}-{self.count:04d}{audio_suffix(audio)}")
+        with speech_metrics.stage("write"), open(path, "wb") as f:
+            f.write(audio)
+        return 0.0
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (
+        PowerShellBackend(),
+        PipeBackend("mpv", ["mpv", "--no-terminal", "--no-video", "--", "-"]),
+        PipeBackend("ffplay", ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", "-i", "-"]),
+        PipeBackend("mpg123", ["mpg123", "-q", "-"], formats=(".mp3",)),
+        PipeBackend("paplay", ["paplay", "--raw", "--format=s16le", "--channels=1", f"--rate={PCM_RATE}"],
+                    decoder=DECODE_TO_PCM),
+        PipeBackend("aplay", ["aplay", "-q", "-f", "S16_LE", "-c", "1", "-r", str(PCM_RATE)],
+                    decoder=DECODE_TO_PCM),
+        NullBackend(),
+    )
+}
+AUTO_ORDER = ["powershell", "mpv", "ffplay", "mpg123", "paplay", "aplay"]
+
+_selected = {}
+
+
+def get_backend(name: str = "auto", suffix: str = ".mp3") -> Backend:
+    """Backend by name; "auto" picks the first available in AUTO_ORDER that plays suffix."""
+    key = (name, suffix) if name == "auto" else name
+    if key not in _selected:
+        if name.startswith("file:"):
+            _selected[key] = FileBackend(name[len("file:"):])
+        elif name == "auto":
+            backend = next((BACKENDS[n] for n in AUTO_ORDER
+                            if suffix in BACKENDS[n].formats and BACKENDS[n].available()), None)
+            if backend is None:
+                hint = "mpv, ffplay or mpg123" if suffix == ".mp3" else "mpv or ffplay"
+                raise PlayerUnavailable(f"no audio player found (install {hint})")
+            _selected[key] = backend
+        elif name in BACKENDS:
+            if not BACKENDS[name].available():
+                raise PlayerUnavailable(f"player '{name}' is not available on this system")
+            _selected[key] = BACKENDS[name]
+        else:
+            raise PlayerUnavailable(f"unknown player '{name}' (choose from: auto, {', '.join(BACKENDS)}, file:DIR)")
+    return _selected[key]
+
+
+def main():
+    print("Audio playback backends:\n")
+    for name, backend in BACKENDS.items():
+        state = "available" if backend.available() else "not found"
+        print(f"  {name:<12} {state}")
+    try:
+        print(f"\n  auto -> {get_backend('auto').name}")
+    except PlayerUnavailable as e:
+        print(f"\n  auto -> {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,20 +6,29 @@ Usage:
     echo "Hello world" | python speak.py
     python speak.py --text "Hello world"
     python speak.py --text "Hello world" --voice en-GB-RyanNeural --rate "+10%"
+    python speak.py --stream --text "Long answer..."  # Play while synthesizing
+    python speak.py --text "Hello" --player mpv        # Pick a playback backend
+    python speak.py --urgent --text "Sir?"             # Interrupt whatever is playing
+    python speak.py --text "Hello" --engine espeak-ng  # Pick a TTS engine (default: auto)
 """
 
 import argparse
-import asyncio
 import os
 from pathlib import Path
 import re
-import subprocess
 import sys
-import tempfile
+import threading
+import time
 
 MUTE_FILE = Path.home() / ".claude" / "jarvis-muted"
+DAEMON_FILE = Path.home() / ".claude" / "jarvis-daemon.json"
+CANCEL_FILE = Path.home() / ".claude" / "jarvis-cancel"  # Touched to interrupt the current speaker
+CANCEL_POLL = 0.02         # Seconds between checks for an interruption
 
-import edge_tts
+# asyncio, subprocess, tempfile, json, multiprocessing and edge_tts are
+# imported where they are used, so a muted call exits before paying for
+# them (edge_tts alone pulls in aiohttp and takes hundreds of milliseconds
+# to import).
 
 # Default JARVIS-like voice settings
 DEFAULT_VOICE = "en-GB-RyanNeural"
@@ -27,111 +36,373 @@ DEFAULT_RATE = "-2%"       # Slightly slower for natural pacing
 DEFAULT_VOLUME = "+0%"
 DEFAULT_PITCH = "-3Hz"     # Slightly deeper
 
+# Character budgets: --summary head keeps the start of a response,
+# extract picks its most important sentences into a shorter budget
+HEAD_MAX_CHARS = 2000
+SUMMARY_MAX_CHARS = 600
 
-def strip_markdown(text: str) -> str:
-    """Strip markdown formatting to produce clean spoken text."""
-    # Remove code blocks (``` ... ```)
-    text = re.sub(r"```[\s\S]*?```", " code block omitted ", text)
-    # Remove inline code (`...`)
-    text = re.sub(r"`([^`]+)`", r"\1", text)
-    # Remove headers (# ... )
-    text = re.sub(r"^#{1,6}\s+", "", text, flags=re.MULTILINE)
-    # Remove bold/italic markers
-    text = re.sub(r"\*{1,3}(.*?)\*{1,3}", r"\1", text)
-    text = re.sub(r"_{1,3}(.*?)_{1,3}", r"\1", text)
-    # Remove links [text](url) -> text
-    text = re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"\1", text)
-    # Remove images ![alt](url)
-    text = re.sub(r"!\[([^\]]*)\]\([^\)]+\)", r"\1", text)
-    # Remove horizontal rules
-    text = re.sub(r"^[-*_]{3,}\s*$", "", text, flags=re.MULTILINE)
-    # Remove bullet points
-    text = re.sub(r"^\s*[-*+]\s+", "", text, flags=re.MULTILINE)
-    # Remove numbered lists prefix
-    text = re.sub(r"^\s*\d+\.\s+", "", text, flags=re.MULTILINE)
-    # Remove blockquotes
-    text = re.sub(r"^>\s+", "", text, flags=re.MULTILINE)
-    # Remove HTML tags
-    text = re.sub(r"<[^>]+>", "", text)
-    # Collapse multiple newlines
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    # Collapse multiple spaces
-    text = re.sub(r"  +", " ", text)
-    # Remove file paths like /path/to/file:123
-    text = re.sub(r"[\w/\\.-]+:\d+", "", text)
-    return text.strip()
-
-
-def add_natural_pauses(text: str) -> str:
-    """Add SSML-friendly pacing cues so speech doesn't sound rushed or choppy.
-
-    Edge-tts handles commas/periods but not always with enough pause.
-    We nudge it by adding thin pauses at natural breath points.
+# Streaming mode: the first sentence is synthesized on its own so audio
+# starts as soon as possible; later ones are merged up to this length so
+# each request to the TTS service is worth its round trip.
+STREAM_MIN_CHARS = 80
+STREAM_LOOKAHEAD = 2       # Synthesized chunks allowed to wait for playback
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class SpeechCancelled(Exception):
+    """Speech was interrupted; remainder is the text not yet heard."""
+
+    def __init__(self, remainder: str = ""):
+        super().__init__("speech cancelled")
+        self.remainder = remainder
+
+
+async def synthesize_bytes(text: str, voice: str, rate: str, volume: str, pitch: str,
+                           boundaries: list = None, engine: str = "auto") -> bytes:
+    """Synthesize text into memory with a TTS engine (see tts_engines.py).
+
+    If boundaries is a list, each sentence's (start, end, text) is appended
+    to it, with start and end in seconds of audio (edge-tts only).
+    """
+    from tts_engines import synthesize
+
+    audio, _used = await synthesize(text, voice, rate, volume, pitch, boundaries, engine)
+    return audio
+
+
+def unheard(text: str, boundaries: list, played: float) -> str:
+    """The part of text not yet fully heard after played seconds.
+
+    Resumes at the start of the sentence that was cut off. Without
+    boundaries (cached or packed audio) that is the whole text.
+    """
+    cursor = 0
+    for _start, end, sentence in boundaries:
+        pos = text.find(sentence, cursor)
+        if end > played:
+            return text[pos:] if pos >= 0 else text[cursor:]
+        if pos >= 0:
+            cursor = pos + len(sentence)
+    return text if not boundaries else text[cursor:].strip()
+
+
+def watch_for_interrupts(cancel: threading.Event, done: threading.Event) -> None:
+    """Set cancel if voice is muted or CANCEL_FILE is touched, until done."""
+    since = time.time_ns()
+    while not done.wait(CANCEL_POLL):
+        try:
+            if CANCEL_FILE.stat().st_mtime_ns > since:
+                break
+        except OSError:
+            pass
+        if MUTE_FILE.exists():
+            break
+    else:
+        return
+    cancel.set()
+
+
+def request_barge_in() -> None:
+    """Interrupt whichever speak.py process is speaking now."""
+    CANCEL_FILE.parent.mkdir(parents=True, exist_ok=True)
+    CANCEL_FILE.touch()
+    os.utime(CANCEL_FILE)
+
+
+async def until_cancelled(coro, cancel: threading.Event = None):
+    """Await coro, abandoning it within CANCEL_POLL once cancel is set.
+
+    Raises SpeechCancelled (with no remainder) when it is abandoned.
+    """
+    import asyncio
+
+    if cancel is None:
+        return await coro
+    task = asyncio.ensure_future(coro)
+    while not task.done():
+        if cancel.is_set():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise SpeechCancelled()
+        await asyncio.wait({task}, timeout=CANCEL_POLL)
+    return task.result()
+
+
+def split_sentences(text: str, min_chars: int = STREAM_MIN_CHARS) -> list[str]:
+    """Split text into chunks for streaming synthesis.
+
+    The first sentence stands alone; later sentences are merged until a
+    chunk reaches min_chars.
+    """
+    chunks = []
+    current = ""
+    for sentence in SENTENCE_END.split(text.strip()):
+        current = f"{current} {sentence}" if current else sentence
+        if not chunks or len(current) >= min_chars:
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def play_audio(filepath: str, player: str = "auto", cancel: threading.Event = None) -> float:
+    """Play an MP3 file with a playback backend (see playback.py).
+
+    Blocks until playback ends and returns the player's start latency.
+    Raises playback.PlaybackCancelled if cancel is set first.
+    """
+    from playback import get_backend
+
+    return timed_play(get_backend(player, os.path.splitext(filepath)[1]).play_file, filepath, cancel)
+
+
+def play_audio_bytes(audio: bytes, player: str = "auto", cancel: threading.Event = None) -> float:
+    """Play an in-memory MP3; file-only players get a short-lived temp file."""
+    from playback import audio_suffix, get_backend
+
+    return timed_play(get_backend(player, audio_suffix(audio)).play_bytes, audio, cancel)
+
+
+def timed_play(play, audio, cancel: threading.Event = None) -> float:
+    """Call a backend's play method, logging player start and playback time."""
+    import speech_metrics
+
+    started = time.perf_counter()
+    latency = play(audio, cancel)
+    speech_metrics.first("player_start", latency)
+    speech_metrics.add("playback", time.perf_counter() - started - latency)
+    return latency
+
+
+async def stream_speech(text: str, voice: str, rate: str, volume: str, pitch: str,
+                        synthesize=synthesize_bytes, play=play_audio_bytes, cancel: threading.Event = None):
+    """Synthesize sentence by sentence while earlier sentences play.
+
+    A producer task synthesizes chunks into memory, at most
+    STREAM_LOOKAHEAD ahead of playback; playback runs in a worker thread so
+    the next chunk is being synthesized while the current one is heard.
+    When cancel is set, synthesis stops and SpeechCancelled carries the
+    unheard text (play should watch the same event).
+    """
+    import asyncio
+
+    from playback import PlaybackCancelled
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=STREAM_LOOKAHEAD)
+    chunks = split_sentences(text)
+
+    async def produce():
+        try:
+            for chunk in chunks:
+                boundaries = []
+                audio = await synthesize(chunk, voice, rate, volume, pitch, boundaries=boundaries)
+                await queue.put((audio, boundaries))
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        for i in range(len(chunks) + 1):
+            try:
+                item = await until_cancelled(queue.get(), cancel)
+            except SpeechCancelled:
+                raise SpeechCancelled(" ".join(chunks[i:])) from None
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            audio, boundaries = item
+            try:
+                await loop.run_in_executor(None, play, audio)
+            except PlaybackCancelled as e:
+                rest = [unheard(chunks[i], boundaries, e.played)] + chunks[i + 1:]
+                raise SpeechCancelled(" ".join(c for c in rest if c)) from None
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+
+def make_synthesizer(engine: str = "auto", cache: bool = True):
+    """A synthesize_bytes() for one utterance, through the audio cache if cache is set.
+
+    Only edge-tts audio is cached. Once "auto" has fallen back to a local
+    engine it stays there, so an utterance isn't spoken in two voices.
+    Pass lookup=False when the caller has already missed the cache.
+    """
+    import speech_metrics
+    from tts_engines import synthesize as engine_synthesize
+
+    async def synthesize(text: str, voice: str, rate: str, volume: str, pitch: str,
+                         boundaries: list = None, lookup: bool = True) -> bytes:
+        nonlocal engine
+        if cache:
+            import audio_cache
+
+            key = audio_cache.cache_key(text, voice, rate, volume, pitch)
+            path = audio_cache.lookup(key) if lookup else None
+            if path is not None:
+                try:
+                    audio = path.read_bytes()
+                except OSError:
+                    pass  # Evicted between lookup and read
+                else:
+                    speech_metrics.note(source="cache")
+                    return audio
+        speech_metrics.note(source="synthesis")
+        audio, used = await engine_synthesize(text, voice, rate, volume, pitch, boundaries, engine)
+        if used != "edge":
+            engine = used
+        elif cache and audio:
+            try:
+                with speech_metrics.stage("write"):
+                    audio_cache.store(key, audio)
+            except OSError:
+                pass
+        return audio
+
+    return synthesize
+
+
+def speak_text(text: str, voice: str, rate: str, volume: str, pitch: str, loop=None,
+               stream: bool = False, cache: bool = True, player: str = "auto",
+               cancel: threading.Event = None, engine: str = "auto", bandwidth: str = "auto"):
+    """Synthesize text and play it.
+
+    With cache set, stock phrases are played from the offline phrase pack
+    (phrase_pack.py), previously synthesized utterances straight from the
+    audio cache, and new ones are added to it (edge-tts audio only, so
+    not with a local engine). Streams sentence by sentence when stream is
+    set, otherwise synthesizes the whole text first. Runs on the given
+    event loop (the speech service keeps one warm), otherwise on a fresh
+    one. Raises playback.PlayerUnavailable or tts_engines.EngineUnavailable
+    before synthesizing anything if the player or engine can't be used.
+
+    bandwidth is "full", "low" or "auto" (low when edge-tts downloads have
+    been measured as slow). Low speaks with a local engine when there is
+    one, and otherwise streams, so each download is a sentence long.
+
+    Setting cancel, muting, or touching CANCEL_FILE stops synthesis and
+    playback within CANCEL_POLL and raises SpeechCancelled with the text
+    that wasn't heard.
+    """
+    import speech_metrics
+
+    with speech_metrics.stage("imports"):
+        import asyncio
+
+        from playback import PlaybackCancelled, get_backend
+        from tts_engines import check_engine, choose_engine, low_bandwidth
+
+    get_backend(player)
+    check_engine(engine)
+    cache = cache and engine in ("auto", "edge")
+    chosen = choose_engine(engine, bandwidth)
+    if chosen in ("auto", "edge") and low_bandwidth(bandwidth):
+        stream = True
+    synthesize = make_synthesizer(chosen, cache)
+
+    def run(coro):
+        if loop is None:
+            return asyncio.run(coro)
+        return loop.run_until_complete(coro)
+
+    def synthesize_all():
+        try:
+            # The cache was already checked for the whole text below
+            return run(until_cancelled(synthesize(text, voice, rate, volume, pitch, boundaries, lookup=False), cancel))
+        except SpeechCancelled:
+            raise SpeechCancelled(text) from None  # Nothing has played yet
+
+    cancel = cancel or threading.Event()
+    done = threading.Event()
+    threading.Thread(target=watch_for_interrupts, args=(cancel, done), daemon=True).start()
+    boundaries = []
+    try:
+        if cache:
+            import phrase_pack
+
+            packed = phrase_pack.find(text, voice, rate, volume, pitch)
+            if packed is not None:
+                speech_metrics.note(source="pack")
+                play_audio_bytes(packed, player, cancel)
+                return
+
+        if stream:
+            def play(audio):
+                return play_audio_bytes(audio, player, cancel)
+
+            run(stream_speech(text, voice, rate, volume, pitch, synthesize=synthesize, play=play, cancel=cancel))
+            return
+
+        if cache:
+            import audio_cache
+
+            key = audio_cache.cache_key(text, voice, rate, volume, pitch)
+            path = audio_cache.lookup(key)
+            if path is not None:
+                speech_metrics.note(source="cache")
+                try:
+                    play_audio(str(path), player, cancel)
+                    return
+                except OSError:
+                    if path.exists():
+                        raise  # The player failed, not the cache
+                    # Evicted between lookup and play: synthesize it instead
+
+        play_audio_bytes(synthesize_all(), player, cancel)
+    except PlaybackCancelled as e:
+        raise SpeechCancelled(unheard(text, boundaries, e.played)) from None
+    finally:
+        done.set()
+
+
+def daemon_request(message: dict, timeout: float = 120):
+    """Send one request to the running speech service (speech_daemon.py).
+
+    Returns its reply, or None if no service is running or it can't be
+    reached. Costs a single stat when the service isn't running.
     """
-    # Add a small pause after commas that don't already have one
-    text = re.sub(r",(\s)", r", \1", text)
-    # Ensure sentences have breathing room (double space after period/question/exclamation)
-    text = re.sub(r"([.!?])(\s)(?=[A-Z])", r"\1  \2", text)
-    # Add a pause after dashes used as breaks (em-dash style)
-    text = re.sub(r"\s*[-–—]\s*", " — ", text)
-    return text
-
-
-def truncate_for_speech(text: str, max_chars: int = 2000) -> str:
-    """Truncate long text for speech, keeping it natural."""
-    if len(text) <= max_chars:
-        return text
-    # Find a sentence boundary near the limit
-    truncated = text[:max_chars]
-    last_period = truncated.rfind(".")
-    last_question = truncated.rfind("?")
-    last_exclaim = truncated.rfind("!")
-    cut_point = max(last_period, last_question, last_exclaim)
-    if cut_point > max_chars * 0.5:
-        return truncated[:cut_point + 1] + " That's the summary of my response."
-    return truncated + "... I'll spare you the rest."
-
-
-async def generate_speech(text: str, output_path: str, voice: str, rate: str, volume: str, pitch: str):
-    """Generate speech audio file using edge-tts."""
-    communicate = edge_tts.Communicate(
-        text,
-        voice=voice,
-        rate=rate,
-        volume=volume,
-        pitch=pitch,
-    )
-    await communicate.save(output_path)
-
-
-def play_audio(filepath: str):
-    """Play an MP3 file using PowerShell's WPF MediaPlayer (Windows)."""
-    ps_script = f'''
-Add-Type -AssemblyName PresentationCore
-$player = New-Object System.Windows.Media.MediaPlayer
-$player.Open([uri]"{filepath}")
-Start-Sleep -Milliseconds 300
-$player.Play()
-# Wait for duration to be available
-$attempts = 0
-while ($player.NaturalDuration.HasTimeSpan -eq $false -and $attempts -lt 50) {{
-    Start-Sleep -Milliseconds 100
-    $attempts++
-}}
-if ($player.NaturalDuration.HasTimeSpan) {{
-    $duration = $player.NaturalDuration.TimeSpan.TotalSeconds
-    Start-Sleep -Seconds ($duration + 0.3)
-}}
-else {{
-    Start-Sleep -Seconds 5
-}}
-$player.Close()
-'''
-    subprocess.run(
-        ["powershell", "-ExecutionPolicy", "Bypass", "-Command", ps_script],
-        capture_output=True,
-        timeout=120,
-    )
+    if not DAEMON_FILE.exists():
+        return None
+
+    import json
+    from multiprocessing import AuthenticationError
+    from multiprocessing.connection import Client
+
+    try:
+        info = json.loads(DAEMON_FILE.read_text(encoding="utf-8"))
+        with Client(info["address"], family=info["family"], authkey=bytes.fromhex(info["authkey"])) as conn:
+            conn.send(message)
+            if not conn.poll(timeout):
+                return None
+            return conn.recv()
+    except (OSError, EOFError, ValueError, KeyError, AuthenticationError):
+        return None
+
+
+def speak_via_daemon(text: str, voice: str, rate: str, volume: str, pitch: str,
+                     stream: bool = False, cache: bool = True, player: str = "auto",
+                     priority=None, engine: str = "auto", bandwidth: str = "auto") -> bool:
+    """Queue text on the warm speech service. False if it didn't take it."""
+    reply = daemon_request({
+        "cmd": "speak",
+        "text": text,
+        "voice": voice,
+        "rate": rate,
+        "volume": volume,
+        "pitch": pitch,
+        "stream": stream,
+        "cache": cache,
+        "player": player,
+        "priority": priority,
+        "engine": engine,
+        "bandwidth": bandwidth,
+    })
+    return bool(reply and reply.get("ok"))
 
 
 def main():
@@ -146,9 +417,29 @@ def main():
     parser.add_argument("--volume", type=str, default=DEFAULT_VOLUME, help="Volume adjustment")
     parser.add_argument("--pitch", "-p", type=str, default=DEFAULT_PITCH, help="Pitch adjustment")
     parser.add_argument("--raw", action="store_true", help="Don't strip markdown formatting")
-    parser.add_argument("--max-chars", type=int, default=2000, help="Max characters to speak (default: 2000)")
+    parser.add_argument("--max-chars", type=int, default=None,
+                        help=f"Max characters to speak (default: {SUMMARY_MAX_CHARS} with extract, {HEAD_MAX_CHARS} with head)")
+    parser.add_argument("--summary", choices=["extract", "head"], default="extract",
+                        help="Long text: speak its key sentences (extract) or its beginning (head)")
+    parser.add_argument("--stream", action="store_true", help="Start playing the first sentence while the rest is synthesized")
+    parser.add_argument("--no-cache", action="store_true", help="Always synthesize; skip the phrase pack and audio cache")
+    parser.add_argument("--player", type=str, default="auto",
+                        help="Playback backend: auto, powershell, mpv, ffplay, mpg123, paplay, aplay, null, file:DIR")
+    parser.add_argument("--engine", type=str, default="auto",
+                        help="TTS engine: auto (edge, local fallback when slow or offline), edge, piper, espeak-ng, fake")
+    parser.add_argument("--bandwidth", type=str, default="auto", choices=["auto", "full", "low"],
+                        help="auto: go local or stream when edge-tts downloads are slow; low: always; full: never")
+    parser.add_argument("--urgent", action="store_true", help="Jump ahead of queued routine speech (questions are urgent automatically)")
+    parser.add_argument("--no-daemon", action="store_true", help="Synthesize in-process even if the speech service is running")
     args = parser.parse_args()
 
+    import speech_metrics
+
+    age = speech_metrics.process_age()
+    speech_metrics.begin(age, voice=args.voice, stream=args.stream)
+    if age:
+        speech_metrics.first("startup", age)
+
     # Get text from argument or stdin
     if args.text:
         text = args.text
@@ -162,26 +453,58 @@ def main():
         sys.exit(0)
 
     # Clean up text for speech
-    if not args.raw:
-        text = strip_markdown(text)
-    text = add_natural_pauses(text)
-    text = truncate_for_speech(text, args.max_chars)
+    from speech_text import prepare
+
+    with speech_metrics.stage("normalize"):
+        max_chars = args.max_chars or (SUMMARY_MAX_CHARS if args.summary == "extract" else HEAD_MAX_CHARS)
+        text = prepare(text, max_chars, markdown=not args.raw, summary=args.summary)
+    speech_metrics.note(chars=len(text))
 
     if not text.strip():
         sys.exit(0)
 
-    # Generate and play speech
-    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
-        tmp_path = tmp.name
+    # Hand off to the warm speech service if one is running
+    cache = not args.no_cache
+    priority = 0 if args.urgent else None  # speech_queue.URGENT, or classify by text
+    if not args.no_daemon:
+        with speech_metrics.stage("handoff"):
+            forwarded = speak_via_daemon(text, args.voice, args.rate, args.volume, args.pitch,
+                                         args.stream, cache, args.player, priority, args.engine,
+                                         args.bandwidth)
+        if forwarded:
+            speech_metrics.note(via="service")
+            speech_metrics.finish("forwarded")
+            return
 
+    # No service: take turns with any other speak.py that is talking, and
+    # give up if this utterance has gone stale waiting
+    with speech_metrics.stage("imports"):
+        from playback import PlayerUnavailable
+        from speech_queue import URGENT, classify, end_turn, wait_turn
+        from tts_engines import EngineUnavailable
+
+    speech_metrics.note(via="process")
+    if priority is not None or classify(text) == URGENT:
+        request_barge_in()
+    with speech_metrics.stage("queued"):
+        turn = wait_turn()
+    if not turn:
+        speech_metrics.finish("stale")
+        sys.exit(0)
+    outcome = "error"
     try:
-        asyncio.run(generate_speech(text, tmp_path, args.voice, args.rate, args.volume, args.pitch))
-        play_audio(tmp_path)
+        speak_text(text, args.voice, args.rate, args.volume, args.pitch,
+                   stream=args.stream, cache=cache, player=args.player, engine=args.engine,
+                   bandwidth=args.bandwidth)
+        outcome = "ok"
+    except SpeechCancelled:
+        outcome = "cancelled"  # Interrupted by a more urgent utterance or by muting
+    except (PlayerUnavailable, EngineUnavailable) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
     finally:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
+        end_turn()
+        speech_metrics.finish(outcome)
 
 
 if __name__ == "__main__":
@@ -3,56 +3,24 @@ Claude Code Stop hook - Speaks the assistant's last response using JARVIS TTS.
 
 This script is triggered by the 'Stop' hook event in Claude Code.
 It reads the conversation transcript, extracts the last assistant message,
-and speaks it aloud using edge-tts neural voices.
+and hands it to speak.py in a detached process, so the hook returns in a
+few milliseconds instead of after the whole response has been spoken.
 """
 
 import json
 import os
-import subprocess
 import sys
 
 
 def get_last_assistant_text(transcript_path: str) -> str:
-    """Extract the last assistant text response from the transcript JSONL file."""
-    if not os.path.exists(transcript_path):
-        return ""
-
-    last_assistant_text = ""
-
-    with open(transcript_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            # Handle different transcript formats
-            role = entry.get("role") or entry.get("type")
-            if role != "assistant":
-                continue
-
-            # Extract text content
-            content = entry.get("message", {}).get("content") or entry.get("content")
-            if content is None:
-                continue
-
-            text_parts = []
-            if isinstance(content, str):
-                text_parts.append(content)
-            elif isinstance(content, list):
-                for block in content:
-                    if isinstance(block, str):
-                        text_parts.append(block)
-                    elif isinstance(block, dict) and block.get("type") == "text":
-                        text_parts.append(block.get("text", ""))
-
-            if text_parts:
-                last_assistant_text = "\n".join(text_parts)
-
-    return last_assistant_text
+    """Extract the last assistant text response from the transcript JSONL file.
+
+    Only what was appended since the previous call is parsed (see
+    transcript_index.py), so the cost doesn't grow with the session.
+    """
+    from transcript_index import last_assistant_text
+
+    return last_assistant_text(transcript_path)
 
 
 def is_voice_enabled() -> bool:
@@ -61,6 +29,37 @@ def is_voice_enabled() -> bool:
     return not os.path.exists(mute_file)
 
 
+def hand_off(text: str) -> None:
+    """Start speak.py on text in the background, detached from the hook.
+
+    The text goes through an anonymous temporary file as stdin, so its
+    length isn't limited by the command line and the write never blocks.
+    """
+    import subprocess
+    import tempfile
+    import time
+
+    speak_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "speak.py")
+    # speak.py times its own startup from the moment it was spawned
+    env = dict(os.environ, PYTHONIOENCODING="utf-8", JARVIS_SPAWNED_AT=str(time.time()))
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    with tempfile.TemporaryFile() as f:
+        f.write(text.encode("utf-8"))
+        f.seek(0)
+        subprocess.Popen(
+            [sys.executable, speak_script],
+            stdin=f,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            **kwargs,
+        )
+
+
 def main():
     # Read hook input from stdin
     try:
@@ -77,24 +76,28 @@ def main():
     if not transcript_path:
         sys.exit(0)
 
+    import speech_metrics
+
+    speech_metrics.begin(via="hook")
+    age = speech_metrics.process_age()
+    if age:
+        speech_metrics.first("startup", age)
+
     # Get the last assistant response
-    text = get_last_assistant_text(transcript_path)
+    with speech_metrics.stage("transcript"):
+        text = get_last_assistant_text(transcript_path)
     if not text.strip():
         sys.exit(0)
 
-    # Speak it using the TTS script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    speak_script = os.path.join(script_dir, "speak.py")
-
-    subprocess.run(
-        [sys.executable, speak_script, "--text", text],
-        timeout=120,
-        capture_output=True,
-    )
+    # Speak it using the TTS script, without waiting for it
+    with speech_metrics.stage("handoff"):
+        hand_off(text)
+    speech_metrics.finish("forwarded")
 
-    # Output success (no blocking)
-    print(json.dumps({"continue": True}))
-    sys.exit(0)
+    # Output success (no blocking), then exit without the interpreter's
+    # teardown: speak.py is starting up alongside and competes for the CPU
+    print(json.dumps({"continue": True}), flush=True)
+    os._exit(0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+JARVIS speech service - keeps the TTS engine warm between speak.py calls.
+
+Every speak.py call otherwise starts a new interpreter, imports edge_tts
+and builds an event loop before it can synthesize a word. The service pays
+for that once, then takes requests over a local socket (a named pipe on
+Windows). speak.py forwards to it while it is running and synthesizes
+in-process when it isn't.
+
+Requests are queued and answered at once; a single worker thread speaks
+them in order (see speech_queue.py for merging, priorities and drops).
+An urgent request interrupts routine speech that is already playing, and
+muting stops it; the unheard rest can be picked up again with resume.
+
+Usage:
+    python speech_daemon.py start    # Start in the background
+    python speech_daemon.py stop     # Stop the running service
+    python speech_daemon.py status   # Show whether it is running
+    python speech_daemon.py run      # Run in the foreground (Ctrl+C to stop)
+    python speech_daemon.py skip     # Stop the current utterance, go on to the next
+    python speech_daemon.py hush     # Stop the current utterance and clear the queue
+    python speech_daemon.py resume   # Replay what was cut off, from its last sentence
+"""
+
+import os
+import secrets
+import sys
+import threading
+import time
+
+from speak import DAEMON_FILE, MUTE_FILE, SpeechCancelled, daemon_request, speak_text
+from speech_queue import URGENT, SpeechQueue, classify
+
+START_TIMEOUT = 15   # Seconds to wait for a background start (edge_tts import)
+REQUEST_TIMEOUT = 5  # Seconds a client gets to authenticate and send its request
+
+
+def listen_address() -> tuple[str, str]:
+    """A per-process socket path (or pipe name on Windows) and its family."""
+    if sys.platform == "win32":
+        return rf"\\.\pipe\jarvis-speech-{os.getpid()}", "AF_PIPE"
+    return str(DAEMON_FILE.parent / f"jarvis-speech-{os.getpid()}.sock"), "AF_UNIX"
+
+
+def write_daemon_file(address: str, family: str, authkey: bytes) -> None:
+    """Publish how to reach this process, readable by the current user only."""
+    import json
+
+    DAEMON_FILE.parent.mkdir(parents=True, exist_ok=True)
+    info = {"pid": os.getpid(), "address": address, "family": family, "authkey": authkey.hex()}
+    tmp_path = DAEMON_FILE.with_suffix(".tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    os.replace(tmp_path, DAEMON_FILE)
+
+
+def remove_daemon_file() -> None:
+    """Remove the daemon file, but only if it still describes this process."""
+    import json
+
+    try:
+        if json.loads(DAEMON_FILE.read_text(encoding="utf-8")).get("pid") == os.getpid():
+            DAEMON_FILE.unlink()
+    except (OSError, ValueError):
+        pass
+
+
+def new_state() -> dict:
+    """What the worker is saying now and what was last cut off."""
+    return {"lock": threading.Lock(), "current": None, "interrupted": None}
+
+
+def interrupt(state: dict, routine_only: bool = False) -> bool:
+    """Cancel the utterance being spoken. False if there was none."""
+    with state["lock"]:
+        current = state["current"]
+        if current is None or (routine_only and current["priority"] == URGENT):
+            return False
+        current["cancel"].set()
+        return True
+
+
+def handle(request: dict, queue: SpeechQueue, state: dict) -> dict:
+    """Carry out one request and return the reply."""
+    cmd = request.get("cmd")
+    if cmd == "ping":
+        return {"ok": True, "pid": os.getpid(), "queued": len(queue),
+                "merged": queue.merged, "dropped": queue.dropped,
+                "speaking": state["current"] is not None,
+                "interrupted": state["interrupted"] is not None}
+    if cmd == "skip":
+        return {"ok": True, "skipped": interrupt(state)}
+    if cmd == "hush":
+        cleared = queue.clear()
+        return {"ok": True, "skipped": interrupt(state), "cleared": cleared}
+    if cmd == "resume":
+        with state["lock"]:
+            interrupted, state["interrupted"] = state["interrupted"], None
+        if interrupted is None:
+            return {"ok": True, "resumed": False}
+        queue.put(interrupted["text"], interrupted["settings"], URGENT)
+        return {"ok": True, "resumed": True}
+    if cmd != "speak":
+        return {"ok": False, "error": f"unknown command: {cmd}"}
+
+    from playback import PlayerUnavailable, get_backend
+    from tts_engines import BANDWIDTHS, EngineUnavailable, check_engine
+
+    settings = {
+        "voice": request["voice"],
+        "rate": request["rate"],
+        "volume": request["volume"],
+        "pitch": request["pitch"],
+        "stream": request.get("stream", False),
+        "cache": request.get("cache", True),
+        "player": request.get("player", "auto"),
+        "engine": request.get("engine", "auto"),
+        "bandwidth": request.get("bandwidth", "auto"),
+    }
+    try:
+        get_backend(settings["player"])
+        check_engine(settings["engine"])
+    except (PlayerUnavailable, EngineUnavailable) as e:
+        return {"ok": False, "error": str(e)}  # The client reports it
+    if settings["bandwidth"] not in BANDWIDTHS:
+        return {"ok": False, "error": f"unknown bandwidth '{settings['bandwidth']}'"}
+    priority = request.get("priority")
+    if priority is None:
+        priority = classify(request["text"])
+    queue.put(request["text"], settings, priority)
+    if priority == URGENT:
+        interrupt(state, routine_only=True)  # Barge in on routine speech
+    return {"ok": True, "queued": len(queue)}
+
+
+def speak_worker(queue: SpeechQueue, state: dict) -> None:
+    """The queue's single consumer: speaks one utterance at a time.
+
+    Utterances that come up while muted are dropped; an interrupted one
+    leaves its unheard text in state for resume.
+    """
+    import asyncio
+
+    import speech_metrics
+
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            utterance = queue.get()
+            if utterance is None:
+                break
+            if MUTE_FILE.exists():
+                continue
+            cancel = threading.Event()
+            with state["lock"]:
+                state["current"] = {"priority": utterance["priority"], "cancel": cancel}
+            queued = time.monotonic() - utterance["queued_at"]
+            speech_metrics.begin(queued, via="service", voice=utterance["settings"]["voice"],
+                                 stream=utterance["settings"]["stream"], chars=len(utterance["text"]))
+            speech_metrics.first("queued", queued)
+            outcome = "error"
+            try:
+                speak_text(utterance["text"], loop=loop, cancel=cancel, **utterance["settings"])
+                outcome = "ok"
+            except SpeechCancelled as e:
+                outcome = "cancelled"
+                if e.remainder.strip():
+                    with state["lock"]:
+                        state["interrupted"] = {"text": e.remainder, "settings": utterance["settings"]}
+            except Exception as e:  # Keep serving
+                print(f"  speak failed: {e}", file=sys.stderr)
+            finally:
+                with state["lock"]:
+                    state["current"] = None
+                speech_metrics.finish(outcome)
+    finally:
+        loop.close()
+
+
+class TimedConnection:
+    """Wraps a connection so reads raise TimeoutError once deadline passes.
+
+    The service accepts one client at a time, so a client that connects
+    and then sends nothing must not hold up everyone after it.
+    """
+
+    def __init__(self, conn, deadline: float):
+        self.conn = conn
+        self.deadline = deadline
+
+    def _wait(self) -> None:
+        if not self.conn.poll(max(0.0, self.deadline - time.monotonic())):
+            raise TimeoutError("client sent nothing")
+
+    def send_bytes(self, buf) -> None:
+        self.conn.send_bytes(buf)
+
+    def recv_bytes(self, maxlength=None) -> bytes:
+        self._wait()
+        return self.conn.recv_bytes(maxlength)
+
+    def recv(self):
+        self._wait()
+        return self.conn.recv()
+
+
+def receive_request(conn, authkey: bytes):
+    """Authenticate a client and read its request within REQUEST_TIMEOUT.
+
+    Raises OSError (TimeoutError included), EOFError or AuthenticationError.
+    """
+    from multiprocessing.connection import answer_challenge, deliver_challenge
+
+    timed = TimedConnection(conn, time.monotonic() + REQUEST_TIMEOUT)
+    # The handshake Listener(authkey=...) would do, but bounded in time
+    deliver_challenge(timed, authkey)
+    answer_challenge(timed, authkey)
+    return timed.recv()
+
+
+def serve() -> None:
+    """Run the service in the foreground until stopped."""
+    from multiprocessing import AuthenticationError
+    from multiprocessing.connection import Listener
+
+    import edge_tts  # noqa: F401  Imported once here so requests don't pay for it
+
+    queue = SpeechQueue()
+    state = new_state()
+    worker = threading.Thread(target=speak_worker, args=(queue, state), daemon=True)
+    worker.start()
+
+    address, family = listen_address()
+    authkey = secrets.token_bytes(32)
+    DAEMON_FILE.parent.mkdir(parents=True, exist_ok=True)
+    if family == "AF_UNIX" and os.path.exists(address):
+        os.unlink(address)
+
+    # Authenticated in receive_request(), where a silent client times out
+    with Listener(address, family) as listener:
+        write_daemon_file(address, family, authkey)
+        print(f"  JARVIS speech service listening (pid {os.getpid()})")
+        try:
+            while True:
+                try:
+                    conn = listener.accept()
+                except OSError:
+                    continue
+                with conn:
+                    try:
+                        request = receive_request(conn, authkey)
+                    except (OSError, EOFError, AuthenticationError):
+                        continue
+                    stop = request.get("cmd") == "stop"
+                    reply = {"ok": True} if stop else handle(request, queue, state)
+                    try:
+                        conn.send(reply)
+                    except OSError:
+                        pass
+                if stop:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            remove_daemon_file()
+            queue.close()
+            interrupt(state)
+            worker.join(timeout=5)
+    print("  JARVIS speech service stopped")
+
+
+def start() -> None:
+    """Start the service as a detached background process."""
+    import subprocess
+
+    reply = daemon_request({"cmd": "ping"}, timeout=2)
+    if reply:
+        print(f"JARVIS speech service: already running (pid {reply['pid']})")
+        return
+
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "run"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **kwargs,
+    )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        reply = daemon_request({"cmd": "ping"}, timeout=2)
+        if reply:
+            print(f"JARVIS speech service: STARTED (pid {reply['pid']})")
+            return
+        time.sleep(0.1)
+    print("JARVIS speech service: failed to start (try `speech_daemon.py run` to see why)")
+    sys.exit(1)
+
+
+def stop() -> None:
+    if daemon_request({"cmd": "stop"}, timeout=5) is None:
+        print("JARVIS speech service: not running")
+    else:
+        print("JARVIS speech service: STOPPED")
+
+
+def status() -> None:
+    reply = daemon_request({"cmd": "ping"}, timeout=2)
+    if reply:
+        print(f"JARVIS speech service: RUNNING (pid {reply['pid']})")
+        print(f"  queued: {reply['queued']}  merged: {reply['merged']}  dropped (stale): {reply['dropped']}")
+        if reply["speaking"]:
+            print("  speaking now")
+        if reply["interrupted"]:
+            print("  an interrupted utterance can be resumed (speech_daemon.py resume)")
+    else:
+        print("JARVIS speech service: not running")
+
+
+def control(cmd: str) -> None:
+    """skip, hush or resume."""
+    reply = daemon_request({"cmd": cmd}, timeout=5)
+    if reply is None:
+        print("JARVIS speech service: not running")
+    elif cmd == "resume":
+        print("JARVIS speech service: RESUMING" if reply["resumed"] else "JARVIS speech service: nothing to resume")
+    else:
+        state = "stopped the current utterance" if reply["skipped"] else "nothing playing"
+        cleared = f", cleared {reply['cleared']} queued" if cmd == "hush" else ""
+        print(f"JARVIS speech service: {state}{cleared}")
+
+
+def main():
+    action = sys.argv[1].lower() if len(sys.argv) > 1 else "status"
+
+    if action == "start":
+        start()
+    elif action == "stop":
+        stop()
+    elif action == "status":
+        status()
+    elif action == "run":
+        serve()
+    elif action in ("skip", "hush", "resume"):
+        control(action)
+    else:
+        print(f"Unknown action: {action}")
+        print("Usage: python speech_daemon.py [start|stop|status|run|skip|hush|resume]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Speech latency log - where the time goes between a request and its audio.
+
+speak.py, the speech service and the Stop hook record one JSON line per
+utterance in LOG_FILE: the stage timings in seconds plus what was spoken
+and how. The log rotates at MAX_BYTES, keeping BACKUPS old files.
+
+    startup       Process spawn until the script starts timing (when known)
+    transcript    The Stop hook reading the last response from the transcript
+    imports       Lazy imports: asyncio, playback, the TTS engine
+    normalize     Markdown stripping, pacing, truncation
+    handoff       Passing the utterance to the speech service
+    queued        Waiting in the speech service's queue
+    ttfb          Synthesis request to its first audio byte
+    synthesis     Synthesis request to its last audio byte
+    write         Writing audio to disk (cache, temp files)
+    player_start  Starting the player until it takes audio
+    playback      Audio playing
+    total         Start of the record to the end of playback
+
+Each line also counts the audio bytes downloaded (edge-tts), so a report
+shows what the cache, the phrase pack and local engines save.
+
+In --stream mode synthesis and playback overlap: ttfb and player_start
+are the first sentence's, synthesis and playback the sums.
+
+Usage:
+    python speech_metrics.py report               # p50/p95/p99 per stage and bytes, by engine and voice
+    python speech_metrics.py report --since 24    # Only the last 24 hours
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+LOG_FILE = Path.home() / ".claude" / "logs" / "jarvis-latency.jsonl"
+MAX_BYTES = 1024 * 1024
+BACKUPS = 3
+STAGES = ["startup", "transcript", "imports", "normalize", "handoff", "queued", "ttfb", "synthesis",
+          "write", "player_start", "playback", "total"]
+
+_record = None  # The utterance being timed in this process, if any
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+def process_age() -> float:
+    """Seconds since this process was spawned, or 0.0 if unknown.
+
+    Uses JARVIS_SPAWNED_AT (a time.time() set by the parent) when present,
+    else /proc on Linux (10 ms resolution).
+    """
+    spawned_at = os.environ.get("JARVIS_SPAWNED_AT")
+    if spawned_at:
+        try:
+            return max(0.0, time.time() - float(spawned_at))
+        except ValueError:
+            pass
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            start_ticks = int(f.read().rsplit(b")", 1)[1].split()[19])
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return 0.0
+    return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+
+
+def begin(age: float = 0.0, **fields) -> None:
+    """Start timing an utterance; age is how long ago it really started."""
+    global _record
+    _record = {"start": time.perf_counter() - age, "fields": fields, "stages": {}}
+
+
+def note(**fields) -> None:
+    """Describe the utterance (engine, source, ...); the first value given wins."""
+    if _record is not None:
+        for key, value in fields.items():
+            _record["fields"].setdefault(key, value)
+
+
+def tally(**counts) -> None:
+    """Add to counters kept with the description (bytes)."""
+    if _record is not None:
+        for key, n in counts.items():
+            _record["fields"][key] = _record["fields"].get(key, 0) + n
+
+
+def add(stage: str, seconds: float) -> None:
+    """Add time to a stage."""
+    if _record is not None:
+        _record["stages"][stage] = _record["stages"].get(stage, 0.0) + seconds
+
+
+def first(stage: str, seconds: float) -> None:
+    """Set a stage unless it already has a value (ttfb, player_start)."""
+    if _record is not None:
+        _record["stages"].setdefault(stage, seconds)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block into a stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, time.perf_counter() - started)
+
+
+def finish(outcome: str = "ok") -> None:
+    """Log the utterance being timed, if any. Logging never raises."""
+    global _record
+    record, _record = _record, None
+    if record is None:
+        return
+    stages = record["stages"]
+    stages["total"] = time.perf_counter() - record["start"]
+    entry = {"ts": round(time.time(), 3), "outcome": outcome, **record["fields"],
+             "stages": {name: round(seconds, 4) for name, seconds in stages.items()}}
+    try:
+        write(json.dumps(entry))
+    except OSError:
+        pass
+
+
+def write(line: str) -> None:
+    """Append a line to LOG_FILE, rotating it first if it is full."""
+    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        full = LOG_FILE.stat().st_size >= MAX_BYTES
+    except FileNotFoundError:
+        full = False
+    if full:
+        for n in range(BACKUPS - 1, 0, -1):
+            older = LOG_FILE.with_name(f"{LOG_FILE.name}.{n}")
+            if older.exists():
+                os.replace(older, LOG_FILE.with_name(f"{LOG_FILE.name}.{n + 1}"))
+        os.replace(LOG_FILE, LOG_FILE.with_name(f"{LOG_FILE.name}.1"))
+    # One write with O_APPEND, so lines from concurrent processes don't interleave
+    fd = os.open(LOG_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    try:
+        os.write(fd, (line + "\n").encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def read_entries(since: float = 0.0) -> list[dict]:
+    """Every logged utterance newer than since (a time.time()), oldest file first."""
+    paths = [LOG_FILE.with_name(f"{LOG_FILE.name}.{n}") for n in range(BACKUPS, 0, -1)] + [LOG_FILE]
+    entries = []
+    for path in paths:
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("ts", 0) >= since:
+                entries.append(entry)
+    return entries
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(1, -(-len(values) * pct // 100))  # Ceiling
+    return values[int(rank) - 1]
+
+
+def print_stages(entries: list[dict]) -> None:
+    print(f"    {'Stage':<14} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name in STAGES:
+        values = sorted(e["stages"][name] for e in entries if name in e.get("stages", {}))
+        if values:
+            row = " ".join(f"{percentile(values, pct) * 1000:>6.0f} ms" for pct in (50, 95, 99))
+            print(f"    {name:<14} {len(values):>6} {row}")
+    sizes = sorted(e["downloaded"] for e in entries if "downloaded" in e)
+    if sizes:
+        row = " ".join(f"{percentile(sizes, pct) / 1000:>6.1f} KB" for pct in (50, 95, 99))
+        print(f"    {'downloaded':<14} {len(sizes):>6} {row}  ({sum(sizes) / 1000:.0f} KB in all)")
+
+
+def report(since_hours: float = 0.0) -> None:
+    since = time.time() - since_hours * 3600 if since_hours else 0.0
+    entries = read_entries(since)
+    if not entries:
+        print(f"  No speech latency data in {LOG_FILE}")
+        return
+
+    window = f"last {since_hours:g} h" if since_hours else "all time"
+    outcomes = {}
+    for entry in entries:
+        outcomes[entry.get("outcome", "ok")] = outcomes.get(entry.get("outcome", "ok"), 0) + 1
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items()))
+    print(f"\n  Speech latency, {window}: {len(entries)} utterances ({summary})\n")
+    print("  All utterances")
+    print_stages(entries)
+
+    groups = {}
+    for entry in entries:
+        if "engine" in entry:
+            groups.setdefault((entry["engine"], entry.get("voice", "?")), []).append(entry)
+    for (engine, voice), group in sorted(groups.items()):
+        print(f"\n  {engine} / {voice}")
+        print_stages(group)
+    print()
+
+
+def main():
+    action = sys.argv[1].lower() if len(sys.argv) > 1 else "report"
+
+    if action == "report":
+        since_hours = 0.0
+        if "--since" in sys.argv:
+            idx = sys.argv.index("--since")
+            try:
+                since_hours = float(sys.argv[idx + 1])
+            except (IndexError, ValueError):
+                print("Usage: python speech_metrics.py report [--since HOURS]")
+                sys.exit(1)
+        report(since_hours)
+    else:
+        print(f"Unknown action: {action}")
+        print("Usage: python speech_metrics.py report [--since HOURS]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Speech scheduling: one voice at a time, questions first, nothing stale.
+
+Claude fires speak.py in the background, so several utterances can arrive
+at once. The speech service pushes them through a SpeechQueue with a
+single consumer:
+
+- Playback is serialized: one utterance plays at a time.
+- Routine utterances queued within COALESCE_WINDOW of each other (same
+  voice settings) are merged and spoken as one.
+- Urgent utterances (questions, or --urgent) jump ahead of routine ones.
+- Anything that waited longer than MAX_AGE is dropped as no longer
+  relevant.
+- An urgent utterance interrupts a routine one that is already playing
+  (barge-in); the service keeps the unheard rest for `resume`.
+
+Without the service, speak.py processes take turns through a lock file
+instead (wait_turn / end_turn). That serializes playback and drops stale
+utterances, but can't merge them or reorder them; an urgent one still
+interrupts the current speaker through speak.CANCEL_FILE.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+URGENT = 0
+ROUTINE = 1
+
+COALESCE_WINDOW = 0.4   # Seconds: routine items this close together are merged
+MAX_AGE = 20.0          # Seconds an utterance may wait before it is dropped
+
+TURN_LOCK = Path.home() / ".claude" / "jarvis-speaking.lock"
+TURN_LOCK_STALE_AFTER = 180  # Longer than any utterance plus the player timeout
+TURN_POLL = 0.05
+
+
+def classify(text: str) -> int:
+    """Questions are urgent: the user needs to hear them to answer."""
+    return URGENT if text.rstrip().endswith("?") else ROUTINE
+
+
+class SpeechQueue:
+    """Thread-safe priority queue with coalescing and staleness drops."""
+
+    def __init__(self, coalesce_window: float = COALESCE_WINDOW, max_age: float = MAX_AGE):
+        self.coalesce_window = coalesce_window
+        self.max_age = max_age
+        self.dropped = 0
+        self.merged = 0
+        self._queues = {URGENT: deque(), ROUTINE: deque()}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, text: str, settings: dict, priority: Optional[int] = None) -> None:
+        """Queue text; settings are the speak_text() keyword arguments.
+
+        priority defaults to classify(text).
+        """
+        if priority is None:
+            priority = classify(text)
+        now = time.monotonic()
+        with self._cond:
+            pending = self._queues[priority]
+            last = pending[-1] if pending else None
+            if (priority == ROUTINE and last is not None and last["settings"] == settings
+                    and now - last["updated_at"] <= self.coalesce_window):
+                last["text"] = f"{last['text']} {text}"
+                last["updated_at"] = now
+                self.merged += 1
+            else:
+                pending.append({
+                    "text": text,
+                    "settings": settings,
+                    "priority": priority,
+                    "queued_at": now,
+                    "updated_at": now,
+                })
+            self._cond.notify()
+
+    def get(self) -> Optional[dict]:
+        """Next utterance to speak; blocks. None once the queue is closed.
+
+        A routine item is held until COALESCE_WINDOW has passed since it
+        last grew, so a burst of acknowledgements is spoken as one.
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                now = time.monotonic()
+                self._drop_stale(now)
+
+                if self._queues[URGENT]:
+                    return self._queues[URGENT].popleft()
+                if self._queues[ROUTINE]:
+                    head = self._queues[ROUTINE][0]
+                    settle = head["updated_at"] + self.coalesce_window - now
+                    if settle <= 0:
+                        return self._queues[ROUTINE].popleft()
+                    self._cond.wait(settle)
+                else:
+                    self._cond.wait()
+
+    def clear(self) -> int:
+        """Drop everything waiting; returns how many utterances that was."""
+        with self._cond:
+            count = len(self._queues[URGENT]) + len(self._queues[ROUTINE])
+            for pending in self._queues.values():
+                pending.clear()
+            return count
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
+
+    def _drop_stale(self, now: float) -> None:
+        for pending in self._queues.values():
+            while pending and now - pending[0]["queued_at"] > self.max_age:
+                pending.popleft()
+                self.dropped += 1
+
+
+def wait_turn(max_age: float = MAX_AGE) -> bool:
+    """Wait for other speak.py processes to finish speaking.
+
+    Returns False if the turn didn't come within max_age (the utterance is
+    stale and should be dropped).
+    """
+    TURN_LOCK.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + max_age
+    while True:
+        try:
+            fd = os.open(TURN_LOCK, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - TURN_LOCK.stat().st_mtime
+            except FileNotFoundError:
+                continue  # Released between our open and stat; try again
+            if age > TURN_LOCK_STALE_AFTER:
+                # No utterance takes this long; its owner died
+                TURN_LOCK.unlink(missing_ok=True)
+                continue
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(TURN_POLL)
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+
+
+def end_turn() -> None:
+    TURN_LOCK.unlink(missing_ok=True)
@@ -0,0 +1,322 @@
+"""
+Turning a response into speakable text for speak.py.
+
+prepare() strips markdown, adds pacing and truncates in one forward pass.
+It reads the input a line at a time and stops once it has enough text to
+fill the speaking budget, so the cost depends on max_chars, not on the
+size of the response. Its output matches the original step-by-step
+strip_markdown() pipeline (see `scripts/benchmark.py normalize`), except
+where that pipeline let a rule run on across lines: a lone backtick
+pairing with one on a later line, or a bare "#" or "-" line swallowing
+the line after it.
+
+With summary="extract" it instead speaks the sentences that matter most
+within the budget (see summarize()), so a long preamble doesn't crowd out
+the conclusion. It reads EXTRACT_WINDOW characters per speakable one from
+each end of the response, where openings and conclusions sit, so its cost
+is bounded by max_chars too.
+"""
+
+import re
+
+CODE_PLACEHOLDER = " code block omitted "
+READAHEAD = 1.25    # Markdown read per speakable character before the first check
+TAIL_MARGIN = 8     # Characters at the cut that may still change with more input
+EXTRACT_WINDOW = 10 # Input read per speakable character from each end in "extract" mode
+
+# Markdown rules, in the order they apply. The ones up to QUOTE are
+# applied a line at a time (see _markdown_lines).
+INLINE_CODE = re.compile(r"`([^`]+)`")
+HEADER = re.compile(r"^#{1,6}\s+")
+BOLD = re.compile(r"\*{1,3}(.*?)\*{1,3}")
+UNDERLINE = re.compile(r"_{1,3}(.*?)_{1,3}")
+LINK = re.compile(r"\[([^\]]+)\]\([^\)]+\)")
+IMAGE = re.compile(r"!\[([^\]]*)\]\([^\)]+\)")
+RULE = re.compile(r"^[-*_]{3,}\s*$")
+BULLET = re.compile(r"^\s*[-*+]\s+")
+NUMBERED = re.compile(r"^\s*\d+\.\s+")
+QUOTE = re.compile(r"^>\s+")
+HTML_TAG = re.compile(r"<[^>]+>")
+BLANK_LINES = re.compile(r"\n{3,}")
+SPACES = re.compile(r"  +")
+FILE_REF = re.compile(r"[\w/\\.-]+:\d+")
+
+# Sentence scoring for summarize()
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])|\s*\n\s*")
+RESULT = re.compile(
+    r"\b(?:done|fixed|added|removed|created|updated|renamed|found|passe[sd]|passing|fail(?:s|ed|ing)?|"
+    r"errors?|works|ready|results?|summary|overall|therefore|because|total|faster|slower)\b"
+    r"|\d+(?:\.\d+)?\s*(?:%|ms\b|x\b|[KMG]B\b)",
+    re.IGNORECASE,
+)
+PREAMBLE = re.compile(
+    r"^(?:let me|let's|i'll|i will|i'm going to|first,? i|sure|okay|ok|great|alright|looking at|now i)\b",
+    re.IGNORECASE,
+)
+NOISE = re.compile(r"\S*[/\\_=<>{}()\[\];|$`]\S*|\b\w+\.[a-z]{1,4}\b")
+SUMMARY_MODES = ["head", "extract"]
+
+# Pacing rules, in the order add_natural_pauses() applies them
+COMMA = re.compile(r",(\s)")
+SENTENCE_GAP = re.compile(r"([.!?])(\s)(?=[A-Z])")
+DASH = re.compile(r"\s*[-–—]\s*")
+
+
+# ---------------------------------------------------------------------------
+# Pacing and truncation
+# ---------------------------------------------------------------------------
+
+def add_natural_pauses(text: str) -> str:
+    """Add SSML-friendly pacing cues so speech doesn't sound rushed or choppy.
+
+    Edge-tts handles commas/periods but not always with enough pause.
+    We nudge it by adding thin pauses at natural breath points.
+    """
+    # Add a small pause after commas that don't already have one
+    text = COMMA.sub(r", \1", text)
+    # Ensure sentences have breathing room (double space after period/question/exclamation)
+    text = SENTENCE_GAP.sub(r"\1  \2", text)
+    # Add a pause after dashes used as breaks (em-dash style)
+    text = DASH.sub(" — ", text)
+    return text
+
+
+def truncate_for_speech(text: str, max_chars: int = 2000) -> str:
+    """Truncate long text for speech, keeping it natural."""
+    if len(text) <= max_chars:
+        return text
+    # Find a sentence boundary near the limit
+    truncated = text[:max_chars]
+    last_period = truncated.rfind(".")
+    last_question = truncated.rfind("?")
+    last_exclaim = truncated.rfind("!")
+    cut_point = max(last_period, last_question, last_exclaim)
+    if cut_point > max_chars * 0.5:
+        return truncated[:cut_point + 1] + " That's the summary of my response."
+    return truncated + "... I'll spare you the rest."
+
+
+# ---------------------------------------------------------------------------
+# Extractive summary
+# ---------------------------------------------------------------------------
+
+def score_sentence(sentence: str, index: int, count: int) -> float:
+    """How much a sentence is worth hearing; zero or less means never.
+
+    Questions and results score up, as do the opening sentence and the
+    closing ones (where conclusions sit). Preambles ("Let me look at..."),
+    code, tables, file paths and headings score down.
+    """
+    score = 1.0
+    if sentence.endswith("?"):
+        score += 3.0
+    score += min(2, len(RESULT.findall(sentence)))
+    if index == 0:
+        score += 1.0
+    from_end = count - 1 - index
+    if from_end < 3:
+        score += (3 - from_end) * 0.5
+    if PREAMBLE.match(sentence):
+        score -= 2.0
+    noise = sum(len(token) for token in NOISE.findall(sentence))
+    score -= 4.0 * noise / len(sentence)
+    if CODE_PLACEHOLDER.strip() in sentence or sentence.count("|") >= 2:
+        score -= 3.0  # A code block or a table row
+    if sentence[-1] not in ".!?" and len(sentence) < 40:
+        score -= 1.0  # A heading or a label, not a sentence
+    return score
+
+
+def summarize(text: str, max_chars: int = 2000) -> str:
+    """The best-scoring sentences of text, in their original order, within max_chars.
+
+    Text that fits is returned as it is. If no sentence is worth keeping
+    or fits, this falls back to truncate_for_speech().
+    """
+    if len(text) <= max_chars:
+        return text
+    sentences = [s.strip() for s in SENTENCE_SPLIT.split(text)]
+    sentences = [s for s in sentences if s]
+    ranked = sorted(
+        ((score_sentence(s, i, len(sentences)), i) for i, s in enumerate(sentences)),
+        key=lambda pair: (-pair[0], pair[1]),
+    )
+    chosen = []
+    size = 0
+    for score, i in ranked:
+        if score <= 0:
+            break
+        if size + len(sentences[i]) + 1 <= max_chars:
+            chosen.append(i)
+            size += len(sentences[i]) + 1
+    if not chosen:
+        return truncate_for_speech(text, max_chars)
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def _ends(text: str, size: int) -> str:
+    """The first and last size characters of text, cut at line breaks.
+
+    Text up to twice size is returned whole. A code fence or tag left open
+    at a cut is dropped, so it doesn't pair with one in the other end. An
+    odd number of fences in the tail is taken to mean it starts inside a
+    block (a response doesn't end in an open one), which saves counting
+    fences through the middle.
+    """
+    if len(text) <= 2 * size:
+        return text
+    cut = text.rfind("\n", 0, size)
+    head = text[:cut if cut > 0 else size]
+    if head.count("```") % 2:
+        head = head[:head.rfind("```")]
+    if head.rfind("<") > head.rfind(">"):
+        head = head[:head.rfind("<")]
+    cut = text.find("\n", len(text) - size)
+    start = cut + 1 if cut >= 0 else len(text) - size
+    tail = text[start:]
+    if tail.count("```") % 2:
+        tail = tail[tail.find("```") + 3:]  # Starts inside a block: skip to its end
+    return head + "\n\n" + tail
+
+
+# ---------------------------------------------------------------------------
+# Single pass
+# ---------------------------------------------------------------------------
+
+def _lines(text: str):
+    """text.split("\\n"), lazily."""
+    pos = 0
+    while True:
+        end = text.find("\n", pos)
+        if end < 0:
+            yield text[pos:]
+            return
+        yield text[pos:end]
+        pos = end + 1
+
+
+def _unfenced_lines(text: str):
+    """Lines of text with fenced code blocks replaced by CODE_PLACEHOLDER.
+
+    Fences pair up as a lazy ```...``` regex pairs them: each ``` with the
+    next one, wherever they fall, so text around a block joins onto one
+    line.
+    """
+    pos = 0
+    carry = ""
+    while True:
+        end = text.find("\n", pos)
+        if end < 0:
+            end = len(text)
+        fence = text.find("```", pos, end)
+        if fence >= 0:
+            close = text.find("```", fence + 3)
+            if close >= 0:
+                carry += text[pos:fence] + CODE_PLACEHOLDER
+                pos = close + 3
+                continue
+        yield carry + text[pos:end]
+        carry = ""
+        if end == len(text):
+            return
+        pos = end + 1
+
+
+def _drop_markers(lines, marker: re.Pattern):
+    """Remove a list marker from each line.
+
+    Like the multiline original, whose leading \\s* reaches back across
+    line breaks, a marked line also swallows the blank lines before it.
+    """
+    blanks = []
+    for line in lines:
+        if not line or line.isspace():
+            blanks.append(line)
+            continue
+        line, marked = marker.subn("", line, count=1)
+        if marked:
+            blanks.clear()
+        yield from blanks
+        blanks.clear()
+        yield line
+    yield from blanks
+
+
+def _markdown_lines(text: str):
+    """The markdown rules up to QUOTE, one line at a time."""
+    def inline(lines):
+        after_rule = False
+        for line in lines:
+            if "`" in line:
+                line = INLINE_CODE.sub(r"\1", line)
+            if line.startswith("#"):
+                line = HEADER.sub("", line, count=1)
+            if "*" in line:
+                line = BOLD.sub(r"\1", line)
+            if "_" in line:
+                line = UNDERLINE.sub(r"\1", line)
+            if "](" in line:
+                line = IMAGE.sub(r"\1", LINK.sub(r"\1", line))
+            if not line or line.isspace():
+                if after_rule:
+                    continue  # RULE's trailing \s* takes the blank lines after it
+            elif line[:1] in ("-", "*", "_"):
+                line, after_rule = RULE.subn("", line, count=1)
+            else:
+                after_rule = False
+            yield line
+
+    for line in _drop_markers(_drop_markers(inline(_unfenced_lines(text)), BULLET), NUMBERED):
+        if line.startswith(">"):
+            line = QUOTE.sub("", line, count=1)
+        yield line
+
+
+def _clean(text: str, markdown: bool) -> str:
+    """The rules that span lines."""
+    if markdown:
+        text = HTML_TAG.sub("", text)
+        text = BLANK_LINES.sub("\n\n", text)
+        text = SPACES.sub(" ", text)
+        text = FILE_REF.sub("", text)
+        text = text.strip()
+    return text
+
+
+def _finish(text: str, markdown: bool) -> str:
+    """The rules that span lines, then pacing."""
+    return add_natural_pauses(_clean(text, markdown))
+
+
+def prepare(text: str, max_chars: int = 2000, markdown: bool = True, summary: str = "head") -> str:
+    """Markdown stripped, pauses added and cut down to about max_chars.
+
+    With markdown False, only pauses and the cut apply (speak.py --raw).
+    summary "head" keeps the start: lines are read until the finished
+    text is known to run past max_chars, and the rest of the input is
+    never looked at. "extract" reads EXTRACT_WINDOW * max_chars
+    characters from each end and keeps the sentences summarize() picks.
+    """
+    if summary == "extract":
+        text = _ends(text, EXTRACT_WINDOW * max_chars)
+        lines = _markdown_lines(text) if markdown else _lines(text)
+        return add_natural_pauses(summarize(_clean("\n".join(lines), markdown), max_chars))
+
+    lines = _markdown_lines(text) if markdown else _lines(text)
+    kept = []
+    size = 0
+    target = int(max_chars * READAHEAD) + TAIL_MARGIN
+    for line in lines:
+        kept.append(line)
+        size += len(line) + 1
+        if size < target:
+            continue
+        target = size * 2
+        joined = "\n".join(kept)
+        if markdown and joined.rfind("<") > joined.rfind(">"):
+            continue  # A tag left open here would swallow text further on
+        finished = _finish(joined, markdown)
+        if len(finished.rstrip()) > max_chars + TAIL_MARGIN:
+            # Only the end can change with more input, and it is cut off
+            return truncate_for_speech(finished, max_chars)
+    return truncate_for_speech(_finish("\n".join(kept), markdown), max_chars)
@@ -0,0 +1,187 @@
+"""
+Incremental reading of Claude Code transcripts for the hooks.
+
+A transcript only ever grows during a session, so every hook call would
+otherwise re-read what the last one already saw. INDEX_FILE remembers, per
+transcript path, the file's identity (device and inode), how far it has
+been parsed and where the latest assistant reply starts. The next call
+parses only what was appended since, scanning it backwards so it stops at
+the newest reply.
+
+An entry is only trusted if the file is still the same inode, is no
+shorter than the parsed offset, and still has the same bytes just before
+that offset. Otherwise (rotated, truncated or rewritten) the transcript
+is read again from its end.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+INDEX_FILE = Path.home() / ".claude" / "cache" / "jarvis-transcripts.json"
+MAX_ENTRIES = 64        # Transcripts remembered; the least recently read are forgotten
+TAIL_BLOCK = 64 * 1024  # Bytes read per step when scanning backwards
+FINGERPRINT = 64        # Bytes before the parsed offset that must be unchanged
+
+
+def assistant_text(entry) -> Optional[str]:
+    """The text of a transcript entry if it is an assistant message with text, else None."""
+    if not isinstance(entry, dict):
+        return None
+
+    # Handle different transcript formats
+    role = entry.get("role") or entry.get("type")
+    if role != "assistant":
+        return None
+
+    # Extract text content
+    message = entry.get("message")
+    content = (message.get("content") if isinstance(message, dict) else None) or entry.get("content")
+    if content is None:
+        return None
+
+    text_parts = []
+    if isinstance(content, str):
+        text_parts.append(content)
+    elif isinstance(content, list):
+        for block in content:
+            if isinstance(block, str):
+                text_parts.append(block)
+            elif isinstance(block, dict) and block.get("type") == "text":
+                text_parts.append(block.get("text", ""))
+
+    return "\n".join(text_parts) if text_parts else None
+
+
+def parse_line(line: bytes) -> Optional[str]:
+    """assistant_text() of one JSONL line; None for blank or broken lines."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return assistant_text(json.loads(line))
+    except ValueError:  # Bad JSON or bad UTF-8
+        return None
+
+
+def reversed_lines(f, start: int, end: int):
+    """(offset, line) for the lines of f[start:end], last first, read backwards TAIL_BLOCK at a time.
+
+    The first one is whatever follows the last newline, possibly empty.
+    """
+    pos = end
+    tail = b""
+    while pos > start:
+        step = min(TAIL_BLOCK, pos - start)
+        pos -= step
+        f.seek(pos)
+        lines = (f.read(step) + tail).split(b"\n")
+        tail = lines.pop(0)  # May continue in the block before
+        offset = pos + len(tail) + 1
+        found = []
+        for line in lines:
+            found.append((offset, line))
+            offset += len(line) + 1
+        yield from reversed(found)
+    yield start, tail
+
+
+def read_line(f, offset: int) -> bytes:
+    f.seek(offset)
+    return f.readline()
+
+
+def load_index() -> dict:
+    try:
+        index = json.loads(INDEX_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+
+def save_index(index: dict) -> None:
+    """Write the index atomically, keeping the MAX_ENTRIES most recently read."""
+    if len(index) > MAX_ENTRIES:
+        recent = sorted(index, key=lambda key: index[key].get("used", 0), reverse=True)
+        index = {key: index[key] for key in recent[:MAX_ENTRIES]}
+    tmp_path = INDEX_FILE.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps(index), encoding="utf-8")
+        os.replace(tmp_path, INDEX_FILE)
+    except OSError:
+        pass  # Next time reads from the end again
+
+
+def still_valid(entry: dict, f, stat: os.stat_result) -> bool:
+    """Whether entry still describes the file open as f."""
+    try:
+        offset = entry["offset"]
+        if (entry["dev"], entry["ino"]) != (stat.st_dev, stat.st_ino) or stat.st_size < offset:
+            return False
+        f.seek(max(0, offset - FINGERPRINT))
+        return f.read(min(offset, FINGERPRINT)).hex() == entry["tail"]
+    except (KeyError, TypeError, OSError):
+        return False
+
+
+def scan(f, size: int, entry: dict):
+    """(last reply's text or None, updated entry) for f, parsing only past entry["offset"].
+
+    Lines between the newest reply and the end hold no reply, so the
+    entry moves up to the end. A last line without its newline may still
+    be being written, so it is read but never indexed.
+    """
+    start = entry["offset"]
+    end = None
+    for offset, line in reversed_lines(f, start, size):
+        if end is None:
+            end = offset
+        text = parse_line(line)
+        if text is not None:
+            if offset < end:
+                entry = {"offset": end, "assistant": offset}
+            return text, entry
+    entry = {"offset": end, "assistant": entry.get("assistant")}
+    if entry["assistant"] is None:
+        return None, entry
+    return parse_line(read_line(f, entry["assistant"])), entry
+
+
+def last_assistant_text(transcript_path: str, use_index: bool = True) -> str:
+    """The text of the last assistant reply in a transcript, or "".
+
+    With use_index, only the part of the transcript appended since the
+    last call is parsed, and INDEX_FILE is updated.
+    """
+    try:
+        f = open(transcript_path, "rb")
+    except OSError:
+        return ""
+
+    with f:
+        stat = os.fstat(f.fileno())
+        key = os.path.abspath(transcript_path)
+        index = load_index() if use_index else {}
+        entry = index.get(key)
+        if entry is not None and still_valid(entry, f, stat):
+            text, entry = scan(f, stat.st_size, entry)
+            if text is None and entry.get("assistant") is not None:
+                entry = None  # The indexed reply is gone: rewritten in place
+        else:
+            entry = None
+        if entry is None:
+            text, entry = scan(f, stat.st_size, {"offset": 0, "assistant": None})
+
+        if use_index:
+            offset = entry["offset"]
+            f.seek(max(0, offset - FINGERPRINT))
+            entry.update(dev=stat.st_dev, ino=stat.st_ino, tail=f.read(min(offset, FINGERPRINT)).hex())
+            previous = index.get(key, {})
+            if {k: v for k, v in previous.items() if k != "used"} != entry:
+                index[key] = dict(entry, used=time.time())
+                save_index(index)  # Only when something moved on
+
+    return text or ""
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Text-to-speech engines for speak.py.
+
+Every engine streams the audio for some text as an async iterator of byte
+chunks. "auto" uses the edge-tts cloud voice, and falls back to a local
+engine when edge-tts fails or hasn't produced its first audio within
+TTFB_BUDGET seconds, so speech keeps working offline and on a slow link.
+
+edge-tts always sends 48 kbps MP3 (its endpoint serves no other format),
+so the way to move fewer bytes is not to fetch them: each edge-tts
+download is timed into LINK_FILE, and while the measured throughput is
+below LOW_THROUGHPUT the "auto" bandwidth goes straight to a local engine
+instead of waiting out TTFB_BUDGET first.
+
+    edge        Microsoft Edge neural voices over the network (MP3)
+    piper       Piper neural TTS, local (WAV); needs JARVIS_PIPER_MODEL
+    espeak-ng   eSpeak NG, local (WAV); robotic but instant
+    fake        Silence after a set delay (tests, benchmarks)
+
+Usage:
+    python tts_engines.py           # List engines and which are available
+"""
+
+import asyncio
+import os
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import speech_metrics
+
+TTFB_BUDGET = 1.0   # Seconds edge-tts gets to start answering before the fallback
+FALLBACK_ORDER = ["piper", "espeak-ng"]
+TICKS_PER_SECOND = 10_000_000  # edge-tts boundary offsets are in 100 ns ticks
+
+# Link measurement. edge-tts audio plays at 6 KB/s; below twice that a
+# long answer can't be fetched comfortably ahead of playback.
+LINK_FILE = Path.home() / ".claude" / "jarvis-link.json"
+LOW_THROUGHPUT = 12_000  # Bytes per second
+MIN_SAMPLE = 16_000      # Bytes a download needs to count as a measurement
+LINK_TTL = 600           # Seconds a measurement is trusted; then edge-tts is tried again
+BANDWIDTHS = ["auto", "full", "low"]
+
+
+class EngineUnavailable(RuntimeError):
+    pass
+
+
+def percent(value: str) -> float:
+    """"+10%" -> 0.1"""
+    match = re.fullmatch(r"\s*([+-]?\d+(?:\.\d+)?)%\s*", value)
+    return float(match.group(1)) / 100 if match else 0.0
+
+
+def hertz(value: str) -> float:
+    """"-3Hz" -> -3.0"""
+    match = re.fullmatch(r"\s*([+-]?\d+(?:\.\d+)?)Hz\s*", value)
+    return float(match.group(1)) if match else 0.0
+
+
+class Engine:
+    """A speech synthesizer. Subclasses implement stream()."""
+
+    name = ""
+    remote = False  # Whether the audio comes over the network
+
+    def available(self) -> bool:
+        return True
+
+    def prepare(self) -> None:
+        """Load whatever the engine needs, ahead of the first request."""
+
+    def stream(self, text: str, voice: str, rate: str, volume: str, pitch: str, boundaries: list = None):
+        """Async iterator over the audio; boundaries as for speak.synthesize_bytes()."""
+        raise NotImplementedError
+
+
+class EdgeEngine(Engine):
+    name = "edge"
+    remote = True
+
+    def available(self) -> bool:
+        from importlib.util import find_spec
+
+        return find_spec("edge_tts") is not None  # Without paying for the import
+
+    def prepare(self) -> None:
+        from importlib import import_module
+
+        import_module("edge_tts")  # Hundreds of ms, kept out of time to first byte
+
+    async def stream(self, text, voice, rate, volume, pitch, boundaries=None):
+        import edge_tts
+
+        communicate = edge_tts.Communicate(text, voice=voice, rate=rate, volume=volume, pitch=pitch)
+        async for message in communicate.stream():
+            if message["type"] == "audio":
+                yield message["data"]
+            elif message["type"] == "SentenceBoundary" and boundaries is not None:
+                start = message["offset"] / TICKS_PER_SECOND
+                boundaries.append((start, start + message["duration"] / TICKS_PER_SECOND, message["text"]))
+
+
+class CommandEngine(Engine):
+    """A command-line synthesizer that reads text on stdin and writes WAV to stdout."""
+
+    def __init__(self, name: str, executable: str):
+        self.name = name
+        self.executable = executable
+
+    def available(self) -> bool:
+        return shutil.which(self.executable) is not None
+
+    def command(self, voice: str, rate: str, volume: str, pitch: str) -> list[str]:
+        raise NotImplementedError
+
+    async def stream(self, text, voice, rate, volume, pitch, boundaries=None):
+        kwargs = {}
+        if sys.platform == "win32":
+            import subprocess
+
+            # speak.py may have no console (Stop hook hand-off, speech service)
+            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+        proc = await asyncio.create_subprocess_exec(
+            *self.command(voice, rate, volume, pitch),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            **kwargs,
+        )
+        try:
+            audio, _ = await proc.communicate(text.encode("utf-8"))
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+        if proc.returncode != 0:
+            raise RuntimeError(f"{self.name} exited with status {proc.returncode}")
+        yield audio
+
+
+class EspeakEngine(CommandEngine):
+    """eSpeak NG. The edge voice's locale picks the espeak voice (en-GB-RyanNeural -> en-gb)."""
+
+    def __init__(self):
+        super().__init__("espeak-ng", "espeak-ng")
+
+    def command(self, voice, rate, volume, pitch):
+        language = "-".join(voice.split("-")[:2]).lower()
+        words_per_minute = round(175 * (1 + percent(rate)))
+        amplitude = min(200, max(0, round(100 * (1 + percent(volume)))))
+        espeak_pitch = min(99, max(0, round(50 + hertz(pitch))))
+        return ["espeak-ng", "--stdin", "--stdout", "-v", language, "-s", str(words_per_minute),
+                "-a", str(amplitude), "-p", str(espeak_pitch)]
+
+
+class PiperEngine(CommandEngine):
+    """Piper with the voice model named by JARVIS_PIPER_MODEL. Only the rate is honoured."""
+
+    def __init__(self):
+        super().__init__("piper", "piper")
+
+    def available(self) -> bool:
+        model = os.environ.get("JARVIS_PIPER_MODEL", "")
+        return super().available() and bool(model) and os.path.exists(model)
+
+    def command(self, voice, rate, volume, pitch):
+        length_scale = 1 / max(0.1, 1 + percent(rate))
+        return ["piper", "--model", os.environ["JARVIS_PIPER_MODEL"], "--output_file", "-",
+                "--length_scale", f"{length_scale:.3f}"]
+
+
+class FakeEngine(Engine):
+    """Silent WAV audio, as long as the text would take to say, after ttfb seconds."""
+
+    name = "fake"
+
+    def __init__(self, ttfb: float = 0.0, chars_per_second: float = 15.0):
+        self.ttfb = ttfb
+        self.chars_per_second = chars_per_second
+
+    async def stream(self, text, voice, rate, volume, pitch, boundaries=None):
+        import io
+        import wave
+
+        await asyncio.sleep(self.ttfb)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(1)
+            wav.setframerate(8000)
+            wav.writeframes(b"\x80" * int(len(text) / self.chars_per_second * 8000))
+        yield buffer.getvalue()
+
+
+ENGINES = {engine.name: engine for engine in (EdgeEngine(), PiperEngine(), EspeakEngine(), FakeEngine())}
+
+
+def get_engine(name: str) -> Engine:
+    """Engine by name; raises EngineUnavailable if it can't be used here."""
+    if name not in ENGINES:
+        raise EngineUnavailable(f"unknown engine '{name}' (choose from: auto, {', '.join(ENGINES)})")
+    if not ENGINES[name].available():
+        raise EngineUnavailable(f"engine '{name}' is not available on this system")
+    return ENGINES[name]
+
+
+def check_engine(name: str) -> None:
+    """Raise EngineUnavailable if name (or "auto") can't synthesize anything."""
+    if name != "auto":
+        get_engine(name)
+    elif not any(ENGINES[n].available() for n in ["edge"] + FALLBACK_ORDER):
+        raise EngineUnavailable("no TTS engine found (pip install edge-tts, or install espeak-ng)")
+
+
+def fallback_engine():
+    return next((ENGINES[n] for n in FALLBACK_ORDER if ENGINES[n].available()), None)
+
+
+def link_throughput():
+    """The last measured edge-tts throughput in bytes per second, or None if stale or unknown."""
+    import json
+
+    try:
+        link = json.loads(LINK_FILE.read_text(encoding="utf-8"))
+        if time.time() - link["at"] < LINK_TTL:
+            return float(link["throughput"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def record_throughput(throughput: float) -> None:
+    """Fold a measurement into LINK_FILE (half old, half new while fresh)."""
+    import json
+
+    previous = link_throughput()
+    if previous is not None:
+        throughput = (previous + throughput) / 2
+    tmp_path = LINK_FILE.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        LINK_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps({"throughput": round(throughput), "at": time.time()}), encoding="utf-8")
+        os.replace(tmp_path, LINK_FILE)
+    except OSError:
+        pass
+
+
+def choose_engine(engine: str, bandwidth: str = "auto") -> str:
+    """The engine to ask for, given a bandwidth setting.
+
+    "low" (or "auto" on a link measured as slow) turns "auto" into the
+    local fallback, so no audio comes over the network. "full" and
+    explicitly named engines are left alone.
+    """
+    if bandwidth not in BANDWIDTHS:
+        raise EngineUnavailable(f"unknown bandwidth '{bandwidth}' (choose from: {', '.join(BANDWIDTHS)})")
+    if engine != "auto" or bandwidth == "full":
+        return engine
+    if bandwidth == "auto":
+        throughput = link_throughput()
+        if throughput is None or throughput >= LOW_THROUGHPUT:
+            return engine
+    fallback = fallback_engine()
+    if fallback is None:
+        return engine
+    speech_metrics.note(fallback=fallback.name)
+    return fallback.name
+
+
+def low_bandwidth(bandwidth: str = "auto") -> bool:
+    """Whether edge-tts audio should come in small pieces: asked for, or measured."""
+    if bandwidth == "auto":
+        throughput = link_throughput()
+        return throughput is not None and throughput < LOW_THROUGHPUT
+    return bandwidth == "low"
+
+
+async def _collect(chunks, engine: Engine, started: float, first: bytes = None) -> bytes:
+    """Join the audio chunks, logging the time to the first one and to the end.
+
+    Downloads (remote engines) are also counted, in bytes.
+    """
+    audio = bytearray()
+    if first is not None:
+        audio += first
+    async for chunk in chunks:
+        if not audio:
+            speech_metrics.first("ttfb", time.perf_counter() - started)
+        audio += chunk
+    speech_metrics.add("synthesis", time.perf_counter() - started)
+    if engine.remote:
+        speech_metrics.tally(downloaded=len(audio))
+    return bytes(audio)
+
+
+def _start(engine: Engine) -> float:
+    """Prepare the engine (logged as imports) and note it; returns the start time."""
+    with speech_metrics.stage("imports"):
+        engine.prepare()
+    speech_metrics.note(engine=engine.name)
+    return time.perf_counter()
+
+
+async def synthesize(text: str, voice: str, rate: str, volume: str, pitch: str,
+                     boundaries: list = None, engine: str = "auto",
+                     budget: float = TTFB_BUDGET) -> tuple[bytes, str]:
+    """Synthesize text with the named engine; returns (audio, engine used).
+
+    "auto" tries edge-tts first. If it fails, or its first audio takes
+    longer than budget, it is abandoned for the first available engine in
+    FALLBACK_ORDER (when there is none, edge-tts gets all the time it
+    needs).
+    """
+    if engine != "auto":
+        chosen = get_engine(engine)
+        started = _start(chosen)
+        return await _collect(chosen.stream(text, voice, rate, volume, pitch, boundaries), chosen, started), engine
+
+    primary = ENGINES["edge"]
+    fallback = fallback_engine()
+    if not primary.available() or fallback is None:
+        check_engine("auto")
+        chosen = primary if primary.available() else fallback
+        started = _start(chosen)
+        return await _collect(chosen.stream(text, voice, rate, volume, pitch, boundaries), chosen, started), chosen.name
+
+    marks = []
+    started = _start(primary)
+    chunks = primary.stream(text, voice, rate, volume, pitch, marks)
+    try:
+        first = await asyncio.wait_for(chunks.__anext__(), budget)
+    except StopAsyncIteration:
+        return b"", primary.name
+    except Exception as e:
+        reason = "too slow" if isinstance(e, asyncio.TimeoutError) else f"failed ({e})"
+        print(f"  edge-tts {reason}; speaking with {fallback.name}", file=sys.stderr)
+        try:
+            await chunks.aclose()
+        except Exception:
+            pass
+        speech_metrics.note(fallback=fallback.name)
+        record_throughput(0.0)  # Nothing arrived in time: treat the link as slow for a while
+        return await _collect(fallback.stream(text, voice, rate, volume, pitch), fallback, started), fallback.name
+    first_at = time.perf_counter()
+    speech_metrics.first("ttfb", first_at - started)
+    audio = await _collect(chunks, primary, started, first)
+    if len(audio) - len(first) >= MIN_SAMPLE:
+        record_throughput((len(audio) - len(first)) / max(time.perf_counter() - first_at, 1e-3))
+    if boundaries is not None:
+        boundaries.extend(marks)
+    return audio, primary.name
+
+
+def main():
+    print("TTS engines:\n")
+    for name, engine in ENGINES.items():
+        state = "available" if engine.available() else "not found"
+        print(f"  {name:<12} {state}")
+    fallback = fallback_engine()
+    if fallback is None:
+        print("\n  auto -> edge (no local engine to fall back to)")
+    else:
+        print(f"\n  auto -> edge, or {fallback.name} if edge fails or takes over {TTFB_BUDGET:g}s to answer")
+    throughput = link_throughput()
+    if throughput is not None:
+        state = "slow" if throughput < LOW_THROUGHPUT else "fine"
+        print(f"  link: {throughput / 1000:.0f} KB/s measured ({state}; slow is under {LOW_THROUGHPUT / 1000:.0f} KB/s)")
+
+
+if __name__ == "__main__":
+    main()